@@ -0,0 +1,22 @@
+import os
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_KEY = os.getenv('API_KEY')
+API_SECRET = os.getenv('API_SECRET')
+
+# Plain REST keeps the account commands quick to start; alpaca-py's
+# TradingClient imports pandas. Same paper endpoint TradingClient defaults to.
+TRADING_URL = 'https://paper-api.alpaca.markets/v2'
+
+def get(path):
+    """GET a trading API resource and return the decoded JSON."""
+    response = requests.get(
+        f'{TRADING_URL}/{path}',
+        headers={'APCA-API-KEY-ID': API_KEY, 'APCA-API-SECRET-KEY': API_SECRET},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()
@@ -1,20 +1,13 @@
-import alpaca_trade_api as tradeapi
 import pandas as pd
+import numpy as np
 import time
-import os
-from dotenv import load_dotenv
-import matplotlib.pyplot as plt
-
-load_dotenv()
-
-API_KEY = os.getenv("API_KEY")
-API_SECRET = os.getenv("API_SECRET")
-BASE_URL = os.getenv("BASE_URL")
+from src.backtest.plotting import render_async
+from src.backtest.result_cache import ResultCache, cache_key, hash_file
+from src.strategy.signals import sma_regime
 
-# Connect to Alpaca API
-api = tradeapi.REST(API_KEY, API_SECRET, BASE_URL, api_version="v2")
-
-df1 = pd.read_csv("src/data/stored_data/SPY_all_data_2015-04-01_to_2025-04-02.csv")
+DATA_FILENAME = "src/data/stored_data/SPY_all_data_2015-04-01_to_2025-04-02.csv"
+RESULTS_FILENAME = "he.csv"
+PLOT_FILENAME = "backtest_ma_results.png"
 
 def save_to_csv(data, filename):
     """Save DataFrame to a CSV file, flattening the index."""
@@ -25,18 +18,12 @@ def save_to_csv(data, filename):
     else:
         print(f"No data to save for {filename}")
 def compute_moving_averages(df, short_window=10, long_window=100):
-    df["SMA50"] = df["close"].rolling(window=short_window).mean()
-    df["SMA200"] = df["close"].rolling(window=long_window).mean()
-    df["Signal"] = 0
-    df.loc[df["SMA50"] > df["SMA200"], "Signal"] = 1  # Buy
-    df.loc[df["SMA50"] < df["SMA200"], "Signal"] = -1  # Sell
+    outputs = sma_regime(short_window, long_window).evaluate({"close": df["close"].to_numpy()})
+    df["SMA50"] = outputs["short_sma"]
+    df["SMA200"] = outputs["long_sma"]
+    df["Signal"] = outputs["signal"].astype(int)  # 1 = Buy, -1 = Sell
     return df
 
-df = compute_moving_averages(df1)
-
-import pandas as pd
-import numpy as np
-
 def backtest(df, initial_capital=100000000):
     """
     Backtests the moving average strategy on the given DataFrame.
@@ -76,17 +63,87 @@ def backtest(df, initial_capital=100000000):
 
     return df
 
-# Run backtest
-df = backtest(df)
-save_to_csv(df, "he.csv")
-# Plot results
-plt.figure(figsize=(12, 6))
-plt.plot(df.index, df["Strategy Capital"], label="Strategy Performance", color="green")
-plt.plot(df.index, df["Buy & Hold"], label="Buy & Hold Performance", linestyle="--", color="blue")
-plt.legend()
-plt.title("Backtest: Moving Average Strategy vs. Buy & Hold")
-plt.xlabel("Date")
-plt.ylabel("Portfolio Value ($)")
-plt.show()
-
+def summarize(strategy_capital, buy_hold, initial_capital):
+    """Headline metrics for a pair of equity curves."""
+    return {
+        "final_capital": float(strategy_capital[-1]),
+        "total_return": float(strategy_capital[-1] / initial_capital - 1),
+        "buy_hold_return": float(buy_hold[-1] / initial_capital - 1),
+        "max_drawdown": float(
+            (strategy_capital / np.maximum.accumulate(strategy_capital) - 1).min()
+        ),
+    }
+
+def run(
+    data_filename=DATA_FILENAME,
+    short_window=10,
+    long_window=100,
+    initial_capital=100000000,
+    cache=None,
+):
+    """
+    Run the moving average backtest, reusing a cached result when the data file,
+    windows and capital are unchanged. The full results CSV is only written when
+    the backtest is actually recomputed.
 
+    Returns:
+    - (arrays, metrics) where arrays holds the 'index', 'Strategy Capital' and
+      'Buy & Hold' curves.
+    """
+    cache = cache or ResultCache()
+    key = cache_key(
+        [hash_file(data_filename)],
+        {
+            "strategy": "backtest_ma",
+            "short_window": short_window,
+            "long_window": long_window,
+            "initial_capital": initial_capital,
+        },
+    )
+
+    def compute():
+        df = compute_moving_averages(
+            pd.read_csv(data_filename), short_window, long_window
+        )
+        df = backtest(df, initial_capital)
+        arrays = {
+            "index": df.index.to_numpy(),
+            "Strategy Capital": df["Strategy Capital"].to_numpy(),
+            "Buy & Hold": df["Buy & Hold"].to_numpy(),
+        }
+        save_to_csv(df, RESULTS_FILENAME)
+        return arrays, summarize(
+            arrays["Strategy Capital"], arrays["Buy & Hold"], initial_capital
+        )
+
+    if key in cache:
+        print(f"Using cached backtest result {key[:12]}")
+    return cache.get_or_compute(key, compute)
+
+if __name__ == "__main__":
+    # Run backtest
+    results, metrics = run()
+
+    # Plot results in the background while the summary prints
+    plot = render_async(
+        PLOT_FILENAME,
+        [
+            {
+                "title": "Backtest: Moving Average Strategy vs. Buy & Hold",
+                "xlabel": "Date",
+                "ylabel": "Portfolio Value ($)",
+                "lines": [
+                    (results["index"], results["Strategy Capital"], {"label": "Strategy Performance", "color": "green"}),
+                    (results["index"], results["Buy & Hold"], {"label": "Buy & Hold Performance", "linestyle": "--", "color": "blue"}),
+                ],
+            }
+        ],
+        figsize=(12, 6),
+    )
+
+    print(f"Final Capital: ${metrics['final_capital']:.2f}")
+    print(f"Total Return: {metrics['total_return'] * 100:.2f}%")
+    print(f"Buy & Hold Return: {metrics['buy_hold_return'] * 100:.2f}%")
+    print(f"Maximum Drawdown: {metrics['max_drawdown'] * 100:.2f}%")
+
+    print(f"\nBacktest plot saved as '{plot.result()}'")
@@ -0,0 +1,233 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from src.data.shared_bars import SharedBarStore, attach
+from src.strategy.signals import sma_regime
+
+# Elements per (paths x bars) array in one batch, so memory stays flat whether
+# we resample daily or minute bars. A batch holds about six arrays of this size
+# at once (indices, paths, log equity, running peak, drawdown, temporaries),
+# so each worker peaks near 6 * 8 bytes * 2**22 ~= 200 MB, times the workers.
+BATCH_ELEMENTS = 2**22
+
+MINUTE_PERIODS_PER_YEAR = 252 * 390
+DAILY_PERIODS_PER_YEAR = 252
+
+# Default block lengths: one session of minute bars, about a month of days
+MINUTE_BLOCK_SIZE = 390
+DAILY_BLOCK_SIZE = 20
+
+# Zero-copy view of the shared series, set once per process by _init_worker
+_SERIES = None
+
+
+def block_bootstrap_indices(rng, n_paths, length, block_size):
+    """Moving-block bootstrap indices, shape (n_paths, length)."""
+    block_size = max(1, min(block_size, length))
+    n_blocks = -(-length // block_size)
+    starts = rng.integers(0, length - block_size + 1, size=(n_paths, n_blocks))
+    idx = starts[:, :, None] + np.arange(block_size)
+    return idx.reshape(n_paths, -1)[:, :length]
+
+
+def shuffle_indices(rng, n_paths, length):
+    """Independent random permutations of range(length), shape (n_paths, length)."""
+    idx = np.tile(np.arange(length), (n_paths, 1))
+    return rng.permuted(idx, axis=1)
+
+
+def resample(rng, series, n_paths, method="block", block_size=MINUTE_BLOCK_SIZE):
+    """Draw n_paths resamples of a 1-D series as a (n_paths, len) matrix."""
+    if method == "block":
+        idx = block_bootstrap_indices(rng, n_paths, len(series), block_size)
+    elif method == "shuffle":
+        idx = shuffle_indices(rng, n_paths, len(series))
+    else:
+        raise ValueError(f"Unknown resampling method: {method}")
+    return series[idx]
+
+
+def sma_strategy_returns(bar_returns, short_window=10, long_window=100):
+    """Apply the SMA regime rule (long while short > long, else flat) to each path."""
+    prices = np.exp(np.cumsum(np.log1p(bar_returns), axis=-1))
+    position = sma_regime(short_window, long_window).evaluate({"close": prices})["signal"] == 1
+    strategy = np.zeros_like(bar_returns)
+    strategy[..., 1:] = position[..., :-1] * bar_returns[..., 1:]
+    return strategy
+
+
+def path_metrics(returns, periods_per_year):
+    """Sharpe, max drawdown and total return for each row of a return matrix."""
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1)
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0)
+    log_equity = np.cumsum(np.log1p(returns), axis=1)
+    drawdown = np.exp(log_equity - np.maximum.accumulate(log_equity, axis=1)) - 1
+    return {
+        "sharpe": sharpe * np.sqrt(periods_per_year),
+        "max_drawdown": drawdown.min(axis=1),
+        "total_return": np.expm1(log_equity[:, -1]),
+    }
+
+
+def _init_worker(handle):
+    global _SERIES
+    _SERIES = attach(handle)["series"]
+
+
+def _evaluate_batch(seed, n_paths, kind, method, block_size, periods_per_year, windows):
+    """Resample and score one batch of paths inside a worker."""
+    rng = np.random.default_rng(seed)
+    paths = resample(rng, _SERIES, n_paths, method, block_size)
+    if kind == "bars":
+        paths = sma_strategy_returns(paths, *windows)
+    return path_metrics(paths, periods_per_year)
+
+
+def confidence_intervals(metrics, level=0.95):
+    """Percentile interval and median for each metric across all paths."""
+    tail = (1 - level) / 2 * 100
+    return {
+        name: (
+            float(np.percentile(values, tail)),
+            float(np.median(values)),
+            float(np.percentile(values, 100 - tail)),
+        )
+        for name, values in metrics.items()
+    }
+
+
+def _run(
+    kind,
+    series,
+    n_paths,
+    method,
+    block_size,
+    periods_per_year,
+    level,
+    seed,
+    max_workers,
+    windows=None,
+):
+    series = np.asarray(series, dtype=np.float64)
+    series = series[~np.isnan(series)]
+    batch_size = max(1, min(n_paths, BATCH_ELEMENTS // len(series)))
+    sizes = [batch_size] * (n_paths // batch_size)
+    if n_paths % batch_size:
+        sizes.append(n_paths % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    with SharedBarStore() as store, ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(store.publish(kind, {"series": series}),),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _evaluate_batch,
+                child,
+                size,
+                kind,
+                method,
+                block_size,
+                periods_per_year,
+                windows,
+            )
+            for child, size in zip(seeds, sizes)
+        ]
+        batches = [future.result() for future in futures]
+
+    metrics = {
+        name: np.concatenate([batch[name] for batch in batches])
+        for name in batches[0]
+    }
+    if kind == "returns" and method == "shuffle":
+        # A permutation keeps the mean, spread and product of the returns,
+        # so only the drawdown varies between shuffled paths
+        metrics = {"max_drawdown": metrics["max_drawdown"]}
+    return {"paths": metrics, "intervals": confidence_intervals(metrics, level)}
+
+
+def bootstrap_returns(
+    returns,
+    n_paths=10000,
+    method="block",
+    block_size=DAILY_BLOCK_SIZE,
+    periods_per_year=DAILY_PERIODS_PER_YEAR,
+    level=0.95,
+    seed=None,
+    max_workers=None,
+):
+    """
+    Resample a strategy's return series and report metric confidence intervals.
+
+    Parameters:
+    - returns: 1-D per-bar strategy returns (e.g. run_backtest's 'strategy_returns').
+    - method: 'block' for a moving-block bootstrap, 'shuffle' for permutations.
+      Shuffling leaves Sharpe and total return unchanged, so 'shuffle'
+      reports only max_drawdown.
+    - block_size: Bars per block; about a month of daily returns by default.
+      Use MINUTE_BLOCK_SIZE (with MINUTE_PERIODS_PER_YEAR) for minute returns.
+
+    Returns:
+    - A dict with per-path metric arrays under 'paths' and
+      (low, median, high) tuples under 'intervals'.
+    """
+    return _run(
+        "returns",
+        returns,
+        n_paths,
+        method,
+        block_size,
+        periods_per_year,
+        level,
+        seed,
+        max_workers,
+    )
+
+
+def bootstrap_bars(
+    close,
+    short_window=10,
+    long_window=100,
+    n_paths=10000,
+    method="block",
+    block_size=MINUTE_BLOCK_SIZE,
+    periods_per_year=MINUTE_PERIODS_PER_YEAR,
+    level=0.95,
+    seed=None,
+    max_workers=None,
+):
+    """
+    Resample the underlying bar returns and re-run the SMA strategy on every path.
+
+    Same return value as bootstrap_returns.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    bar_returns = close[1:] / close[:-1] - 1
+    return _run(
+        "bars",
+        bar_returns,
+        n_paths,
+        method,
+        block_size,
+        periods_per_year,
+        level,
+        seed,
+        max_workers,
+        windows=(short_window, long_window),
+    )
+
+
+def print_intervals(result, level=0.95):
+    """Print the confidence intervals from a bootstrap result."""
+    print(f"\n{level * 100:.0f}% confidence intervals (low / median / high):")
+    for name, (low, median, high) in result["intervals"].items():
+        print(f"{name:>14}: {low:.4f} / {median:.4f} / {high:.4f}")
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("src/data/stored_data/SPY_all_data_2015-04-01_to_2025-04-02.csv")
+    result = bootstrap_bars(df["close"], short_window=10, long_window=100, n_paths=1000)
+    print_intervals(result)
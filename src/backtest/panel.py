@@ -0,0 +1,164 @@
+import numpy as np
+from src.backtest.bootstrap import MINUTE_PERIODS_PER_YEAR
+from src.data.bar_store import BarStore
+from src.data.feature_store import FeatureStore
+from src.strategy.signals import sma_regime
+
+
+def merge_clocks(timestamp_arrays):
+    """
+    Union of several sorted timestamp arrays as one sorted clock.
+
+    The stable sort is a timsort, which merges the already-sorted runs in
+    near-linear time rather than re-sorting from scratch.
+    """
+    merged = np.concatenate(timestamp_arrays)
+    merged.sort(kind="stable")
+    if len(merged) == 0:
+        return merged
+    keep = np.empty(len(merged), dtype=bool)
+    keep[0] = True
+    keep[1:] = merged[1:] != merged[:-1]
+    return merged[keep]
+
+
+def forward_fill_index(timestamps, clock):
+    """
+    For every clock tick, the index of the latest bar at or before it (-1 if none).
+
+    Each bar is placed on the clock, then a running maximum carries it
+    forward in one linear pass.
+    """
+    marker = np.full(len(clock), -1, dtype=np.int64)
+    marker[np.searchsorted(clock, timestamps)] = np.arange(len(timestamps))
+    return np.maximum.accumulate(marker)
+
+
+class Panel:
+    """Dense float32 (time x symbol) matrices on a shared clock."""
+
+    def __init__(self, clock, symbols, fields):
+        self.clock = clock
+        self.symbols = list(symbols)
+        self.fields = fields
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    @property
+    def shape(self):
+        return len(self.clock), len(self.symbols)
+
+
+def build_panel(data, fields=("close",)):
+    """
+    Align per-symbol bars onto one clock with forward-fill.
+
+    Parameters:
+    - data: {symbol: {'timestamp': sorted int64 array, field: array, ...}}.
+
+    Returns:
+    - A Panel; a symbol's cells before its first bar are NaN.
+    """
+    symbols = list(data)
+    clock = merge_clocks([data[s]["timestamp"] for s in symbols])
+    matrices = {
+        field: np.empty((len(clock), len(symbols)), dtype=np.float32, order="F")
+        for field in fields
+    }
+    for j, symbol in enumerate(symbols):
+        idx = forward_fill_index(data[symbol]["timestamp"], clock)
+        before_first = idx < 0
+        for field in fields:
+            column = np.asarray(data[symbol][field], dtype=np.float32)[idx]
+            column[before_first] = np.nan
+            matrices[field][:, j] = column
+    return Panel(clock, symbols, matrices)
+
+
+def load_panel(symbols, store=None, fields=("close",), start=None, end=None):
+    """Build a Panel straight from the binary bar store."""
+    store = store or BarStore()
+    return build_panel(
+        {s: store.read(s, ["timestamp", *fields], start, end) for s in symbols}, fields
+    )
+
+
+def sma_weights(close, short_window=10, long_window=100):
+    """Equal-weight (1 / n symbols) long while a symbol's short SMA is above its long SMA."""
+    weights = np.zeros(close.shape, dtype=np.float32, order="F")
+    graph = sma_regime(short_window, long_window)
+    for j in range(close.shape[1]):
+        weights[:, j] = graph.evaluate({"close": close[:, j]})["signal"] == 1
+    weights /= close.shape[1]
+    return weights
+
+
+def stored_sma_weights(panel, short_window=10, long_window=100, features=None):
+    """
+    sma_weights from the feature store: each symbol's SMA regime signal is
+    read precomputed on its own bars and carried onto the panel clock.
+    """
+    features = features or FeatureStore()
+    graph = sma_regime(short_window, long_window)
+    weights = np.zeros(panel.shape, dtype=np.float32, order="F")
+    for j, symbol in enumerate(panel.symbols):
+        stored = features.load(symbol, {"signal": graph.outputs["signal"]}, panel.clock[0], panel.clock[-1] + 1)
+        idx = forward_fill_index(stored["timestamp"], panel.clock)
+        weights[:, j] = np.where(idx >= 0, stored["signal"][idx] == 1, False)
+    weights /= len(panel.symbols)
+    return weights
+
+
+def backtest_portfolio(
+    close,
+    weights,
+    initial_capital=100000.0,
+    cost_bps=0.0,
+    periods_per_year=MINUTE_PERIODS_PER_YEAR,
+):
+    """
+    Vectorised portfolio backtest over (time x symbol) matrices.
+
+    weights[t] are the target weights decided at bar t's close and held over
+    the next bar, rebalancing every bar. Turnover is charged cost_bps.
+    Symbols are processed one column at a time, so extra memory is O(time).
+
+    Returns:
+    - (equity curve, metrics dict).
+    """
+    n_bars, n_symbols = close.shape
+    portfolio_returns = np.zeros(n_bars)
+    turnover = np.zeros(n_bars)
+
+    for j in range(n_symbols):
+        prices = close[:, j].astype(np.float64)
+        held = np.nan_to_num(weights[:, j]).astype(np.float64)
+        returns = np.zeros(n_bars)
+        returns[1:] = prices[1:] / prices[:-1] - 1
+        returns[np.isnan(returns)] = 0.0
+        portfolio_returns[1:] += held[:-1] * returns[1:]
+        turnover[0] += abs(held[0])
+        turnover[1:] += np.abs(np.diff(held))
+
+    portfolio_returns -= turnover * cost_bps / 1e4
+    equity = initial_capital * np.cumprod(1 + portfolio_returns)
+    std = portfolio_returns.std(ddof=1)
+    metrics = {
+        "total_return": float(equity[-1] / initial_capital - 1),
+        "sharpe_ratio": float(
+            portfolio_returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+        ),
+        "max_drawdown": float((equity / np.maximum.accumulate(equity) - 1).min()),
+        "turnover": float(turnover.sum()),
+    }
+    return equity, metrics
+
+
+if __name__ == "__main__":
+    panel = load_panel(["SPY", "TQQQ"])
+    equity, metrics = backtest_portfolio(panel["close"], stored_sma_weights(panel))
+    print(f"Bars: {panel.shape[0]}, Symbols: {panel.symbols}")
+    print(f"Total Return: {metrics['total_return'] * 100:.2f}%")
+    print(f"Sharpe Ratio: {metrics['sharpe_ratio']:.4f}")
+    print(f"Maximum Drawdown: {metrics['max_drawdown'] * 100:.2f}%")
@@ -0,0 +1,469 @@
+import io
+import re
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext, redirect_stdout
+import numpy as np
+import pandas as pd
+from src.data.bar_store import BarStore
+from src.data.ingest import SESSION_CLOSE, SESSION_OPEN
+from src.stockinfo.snapshots import SnapshotService
+
+MINUTE_NS = 60 * 10**9
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "trade_count", "vwap"]
+
+Clock = namedtuple("Clock", ["timestamp", "is_open", "next_open", "next_close"])
+Account = namedtuple(
+    "Account", ["cash", "buying_power", "equity", "last_equity", "portfolio_value", "status"]
+)
+Position = namedtuple(
+    "Position",
+    ["symbol", "qty", "avg_entry_price", "current_price", "market_value", "unrealized_pl"],
+)
+Trade = namedtuple("Trade", ["symbol", "price", "size", "timestamp"])
+Bar = namedtuple("Bar", ["symbol", "timestamp", *BAR_COLUMNS])
+Snapshot = namedtuple("Snapshot", ["latest_trade", "latest_quote", "minute_bar", "daily_bar"])
+
+
+class BarSet:
+    """get_bars() result; like alpaca_trade_api's, the bars are in .df."""
+
+    def __init__(self, df):
+        self.df = df
+
+
+class SimOrder:
+    """An order held by the PaperBroker, with the fields the bots read back."""
+
+    def __init__(self, symbol, qty, side, type, time_in_force, limit_price, stop_price, client_order_id, submitted_at):
+        self.id = str(uuid.uuid4())
+        self.client_order_id = client_order_id or self.id
+        self.symbol = symbol
+        self.qty = float(qty)
+        self.side = side
+        self.type = type
+        self.time_in_force = time_in_force
+        self.limit_price = None if limit_price is None else float(limit_price)
+        self.stop_price = None if stop_price is None else float(stop_price)
+        self.status = "new"
+        self.filled_qty = 0.0
+        self.filled_avg_price = None
+        self.submitted_at = submitted_at
+        self.filled_at = None
+
+
+def _value(field):
+    """Plain value of an alpaca-py enum or a string."""
+    return getattr(field, "value", field)
+
+
+def _to_ns(when):
+    if when is None:
+        return None
+    stamp = pd.Timestamp(when)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize("UTC")
+    return stamp.value
+
+
+def _stamp(ns):
+    return None if ns is None else pd.Timestamp(int(ns), tz="UTC")
+
+
+def _timeframe(timeframe):
+    """(amount, unit) from a TimeFrame or a string like '1Day' / '5Min'."""
+    match = re.fullmatch(r"(\d+)(Min|T|Hour|H|Day|D)", str(_value(timeframe)))
+    if match is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(match.group(1)), match.group(2)[0]
+
+
+def _complete(columns):
+    """Bar columns with any missing price field taken from close, counts from zero."""
+    bars = {"timestamp": np.asarray(columns["timestamp"], dtype=np.int64)}
+    for name in BAR_COLUMNS:
+        if name in columns:
+            bars[name] = np.asarray(columns[name])
+        elif name in ("open", "high", "low", "vwap"):
+            bars[name] = np.asarray(columns["close"])
+        else:
+            bars[name] = np.zeros(len(bars["timestamp"]), dtype=np.int64)
+    return bars
+
+
+def _aggregate(bars, starts, stop):
+    """OHLCV bars for minute groups beginning at starts, the last ending at stop."""
+    ends = np.append(starts[1:], stop)
+    volume = np.add.reduceat(bars["volume"][:stop].astype(np.float64), starts)
+    notional = np.add.reduceat((bars["vwap"][:stop] * bars["volume"][:stop]).astype(np.float64), starts)
+    return {
+        "open": bars["open"][starts],
+        "high": np.maximum.reduceat(bars["high"][:stop], starts),
+        "low": np.minimum.reduceat(bars["low"][:stop], starts),
+        "close": bars["close"][ends - 1],
+        "volume": volume,
+        "trade_count": np.add.reduceat(bars["trade_count"][:stop].astype(np.int64), starts),
+        "vwap": np.divide(notional, volume, out=bars["close"][ends - 1].astype(np.float64), where=volume > 0),
+    }
+
+
+class PaperBroker:
+    """
+    In-process broker on a virtual clock, fed from stored minute bars.
+
+    Implements the REST calls the SPY bots and the order.py helpers make:
+    get_clock, get_bars, get_position, get_account, get_latest_trade,
+    get_snapshots and submit_order (both the alpaca_trade_api keyword form
+    and alpaca-py's order_data form). Nothing here reads the wall clock:
+    "now" only moves through advance(), and every answer uses bars that had
+    closed by then.
+
+    Market orders, and limit orders already through the market, fill at once
+    at the latest trade plus slippage_bps (never worse than the limit).
+    Other limit and stop orders rest until a later minute bar trades through
+    them, filling at the better of the order price and that bar's open.
+    """
+
+    def __init__(self, bars, initial_cash=100000.0, slippage_bps=0.0):
+        self.bars = {symbol: _complete(columns) for symbol, columns in bars.items()}
+        self.cash = float(initial_cash)
+        self.last_equity = self.cash
+        self.slippage_bps = slippage_bps
+        self.positions = {}
+        self.entry_prices = {}
+        self.orders = []
+        self.open_orders = []
+        self._resampled = {}
+        self.sessions = self._sessions(next(iter(self.bars.values()))["timestamp"])
+        self.now = int(self.sessions[0, 0])
+
+    @classmethod
+    def from_store(cls, symbols, store=None, start=None, end=None, **kwargs):
+        store = store or BarStore()
+        return cls({s: store.read(s, None, start, end) for s in symbols}, **kwargs)
+
+    @staticmethod
+    def _sessions(timestamps):
+        """(open, close) ns for each New York day with regular-hours bars; early closes end after the last bar."""
+        local = pd.DatetimeIndex(timestamps, tz="UTC").tz_convert("America/New_York")
+        minute = local.hour * 60 + local.minute
+        regular = (minute >= SESSION_OPEN) & (minute < SESSION_CLOSE)
+        days = local[regular].normalize()
+        last_bar = pd.Series(timestamps[regular], index=days).groupby(level=0).max()
+        opens = (last_bar.index + pd.Timedelta(minutes=SESSION_OPEN)).tz_convert("UTC").asi8
+        closes = np.minimum(
+            (last_bar.index + pd.Timedelta(minutes=SESSION_CLOSE)).tz_convert("UTC").asi8,
+            last_bar.to_numpy() + MINUTE_NS,
+        )
+        return np.column_stack([opens, closes])
+
+    # Virtual clock
+
+    def advance(self, to):
+        """Move the clock forward, filling resting orders on the bars that closed meanwhile."""
+        to = int(to)
+        if to < self.now:
+            raise ValueError("The virtual clock only moves forward")
+        for order in list(self.open_orders):
+            self._fill_resting(order, self.now, to)
+        if self._session_index(to) != self._session_index(self.now):
+            self.last_equity = self.equity()
+        self.now = to
+
+    def _session_index(self, ts):
+        return int(np.searchsorted(self.sessions[:, 0], ts, side="right")) - 1
+
+    def decision_times(self, start, end, bar_minutes=None):
+        """
+        Times in [start, end) to run the strategy: one minute before each
+        session close, or every bar_minutes from each open.
+        """
+        start, end = _to_ns(start), _to_ns(end)
+        times = []
+        for open_, close in self.sessions:
+            if bar_minutes is None:
+                session_times = [close - MINUTE_NS]
+            else:
+                session_times = range(int(open_) + bar_minutes * MINUTE_NS, int(close), bar_minutes * MINUTE_NS)
+            times += [t for t in session_times if (start is None or t >= start) and (end is None or t < end)]
+        return times
+
+    # Market data
+
+    def _last_closed(self, symbol, ts=None):
+        """Index of the last minute bar closed by ts (default now), -1 if none."""
+        ts = self.now if ts is None else ts
+        return int(np.searchsorted(self.bars[symbol]["timestamp"], ts - MINUTE_NS, side="right")) - 1
+
+    def _latest(self, symbol):
+        """Index of the latest closed minute bar; raises before the first one."""
+        i = self._last_closed(symbol)
+        if i < 0:
+            raise ValueError(f"No trades for {symbol} before the virtual clock")
+        return i
+
+    def _price(self, symbol):
+        return float(self.bars[symbol]["close"][self._latest(symbol)])
+
+    def get_clock(self):
+        i = self._session_index(self.now)
+        is_open = i >= 0 and self.now < self.sessions[i, 1]
+        upcoming = self.sessions[self.sessions[:, 0] > self.now]
+        next_open = upcoming[0, 0] if len(upcoming) else None
+        next_close = self.sessions[i, 1] if is_open else (upcoming[0, 1] if len(upcoming) else None)
+        return Clock(_stamp(self.now), bool(is_open), _stamp(next_open), _stamp(next_close))
+
+    def get_latest_trade(self, symbol):
+        i = self._latest(symbol)
+        bars = self.bars[symbol]
+        return Trade(symbol, float(bars["close"][i]), 0, _stamp(bars["timestamp"][i]))
+
+    def _minute_bar(self, symbol, i):
+        bars = self.bars[symbol]
+        return Bar(symbol, _stamp(bars["timestamp"][i]), *(bars[name][i] for name in BAR_COLUMNS))
+
+    def get_latest_bar(self, symbol):
+        return self._minute_bar(symbol, self._latest(symbol))
+
+    def get_snapshots(self, symbols, feed=None):
+        """Same shape SnapshotService expects from the REST client."""
+        out = {}
+        for symbol in symbols:
+            i = self._last_closed(symbol) if symbol in self.bars else -1
+            out[symbol] = None if i < 0 else Snapshot(
+                self.get_latest_trade(symbol), None, self._minute_bar(symbol, i), None
+            )
+        return out
+
+    def _groups(self, symbol, amount, unit):
+        """Minute-bar groups for a timeframe, built once per symbol: (labels, starts, completed bars)."""
+        key = (symbol, amount, unit)
+        if key not in self._resampled:
+            ts = self.bars[symbol]["timestamp"]
+            index = pd.DatetimeIndex(ts, tz="UTC")
+            if unit == "D":
+                # Daily bars are labelled with the New York date, like Alpaca's
+                local = index.tz_convert("America/New_York").normalize()
+                labels = local.tz_convert("UTC").asi8
+            else:
+                labels = index.floor(f"{amount}{'min' if unit in ('M', 'T') else 'h'}").asi8
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(labels)) + 1))
+            self._resampled[key] = (labels, starts, _aggregate(self.bars[symbol], starts, len(ts)))
+        return self._resampled[key]
+
+    def get_bars(self, symbol, timeframe, start=None, end=None, limit=None, **kwargs):
+        """
+        Bars up to the virtual clock, the latest one partial if still forming.
+
+        Requests ending after now are slid back to end at now, keeping their
+        length, so code that asks for "the last year up to today" gets the
+        last year before the virtual now.
+        """
+        amount, unit = _timeframe(timeframe)
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        if end_ns is None or end_ns > self.now:
+            if start_ns is not None and end_ns is not None:
+                start_ns -= end_ns - self.now
+            end_ns = self.now
+        if unit == "D" and amount > 1:
+            raise ValueError("Only 1Day daily bars are supported")
+
+        labels, starts, completed = self._groups(symbol, amount, unit)
+        i = self._last_closed(symbol, end_ns)
+        if i < 0:
+            return BarSet(pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], tz="UTC")))
+        group = int(np.searchsorted(starts, i, side="right")) - 1
+        partial = _aggregate(
+            {name: values[starts[group] : i + 1] for name, values in self.bars[symbol].items()},
+            np.array([0]),
+            i + 1 - starts[group],
+        )
+        columns = {name: np.append(completed[name][:group], partial[name]) for name in BAR_COLUMNS}
+        bar_labels = labels[starts[: group + 1]]
+
+        lo = 0 if start_ns is None else int(np.searchsorted(bar_labels, start_ns, side="left"))
+        columns = {name: values[lo:] for name, values in columns.items()}
+        df = pd.DataFrame(columns, index=pd.DatetimeIndex(bar_labels[lo:], tz="UTC", name="timestamp"))
+        return BarSet(df.tail(limit) if limit else df)
+
+    # Account and positions
+
+    def equity(self):
+        return self.cash + sum(qty * self._price(s) for s, qty in self.positions.items() if qty)
+
+    def get_account(self):
+        equity = self.equity()
+        return Account(self.cash, max(self.cash, 0.0), equity, self.last_equity, equity, "ACTIVE")
+
+    def get_position(self, symbol):
+        """Raises ValueError when there is no position, as the REST API errors."""
+        qty = self.positions.get(symbol, 0.0)
+        if qty == 0:
+            raise ValueError(f"position does not exist: {symbol}")
+        price = self._price(symbol)
+        entry = self.entry_prices[symbol]
+        return Position(symbol, qty, entry, price, qty * price, qty * (price - entry))
+
+    def list_positions(self):
+        return [self.get_position(s) for s, qty in self.positions.items() if qty]
+
+    get_all_positions = list_positions
+
+    # Orders
+
+    def submit_order(
+        self,
+        symbol=None,
+        qty=None,
+        side=None,
+        type="market",
+        time_in_force="day",
+        limit_price=None,
+        stop_price=None,
+        client_order_id=None,
+        order_data=None,
+        **kwargs,
+    ):
+        """Accepts alpaca_trade_api keywords or an alpaca-py order request as order_data."""
+        if order_data is not None:
+            symbol = order_data.symbol
+            qty = order_data.qty
+            side = _value(order_data.side)
+            type = _value(order_data.type)
+            time_in_force = _value(order_data.time_in_force)
+            limit_price = getattr(order_data, "limit_price", None)
+            stop_price = getattr(order_data, "stop_price", None)
+            client_order_id = order_data.client_order_id
+        type = _value(type)
+        if type not in ("market", "limit", "stop", "stop_limit"):
+            raise ValueError(f"Unsupported order type: {type}")
+        if symbol not in self.bars:
+            raise ValueError(f"No bars loaded for {symbol}")
+
+        order = SimOrder(
+            symbol, qty, _value(side), type, _value(time_in_force),
+            limit_price, stop_price, client_order_id, _stamp(self.now),
+        )
+        self.orders.append(order)
+        slip = self.slippage_bps / 1e4
+        price = self._price(symbol) * (1 + slip if order.side == "buy" else 1 - slip)
+        if type == "market":
+            self._fill(order, price, self.now)
+        elif type == "limit" and self._marketable(order, price):
+            # A limit already through the market fills now, never worse than the limit
+            limit = order.limit_price
+            self._fill(order, min(price, limit) if order.side == "buy" else max(price, limit), self.now)
+        else:
+            order.status = "accepted"
+            self.open_orders.append(order)
+        return order
+
+    @staticmethod
+    def _marketable(order, price):
+        return price <= order.limit_price if order.side == "buy" else price >= order.limit_price
+
+    def cancel_order(self, order_id):
+        for order in list(self.open_orders):
+            if order.id == order_id:
+                order.status = "canceled"
+                self.open_orders.remove(order)
+
+    def _fill(self, order, price, ts):
+        signed = order.qty if order.side == "buy" else -order.qty
+        held = self.positions.get(order.symbol, 0.0)
+        if held == 0 or np.sign(held) == np.sign(signed):
+            total = abs(held) + abs(signed)
+            self.entry_prices[order.symbol] = (
+                abs(held) * self.entry_prices.get(order.symbol, price) + abs(signed) * price
+            ) / total
+        elif abs(signed) > abs(held):
+            self.entry_prices[order.symbol] = price
+        self.positions[order.symbol] = held + signed
+        self.cash -= signed * price
+        order.status = "filled"
+        order.filled_qty = order.qty
+        order.filled_avg_price = price
+        order.filled_at = _stamp(ts)
+        if order in self.open_orders:
+            self.open_orders.remove(order)
+
+    def _fill_resting(self, order, after, until):
+        """Fill a limit/stop order on the first bar closing in (after, until] that trades through it."""
+        bars = self.bars[order.symbol]
+        lo = self._last_closed(order.symbol, after) + 1
+        hi = self._last_closed(order.symbol, until) + 1
+        if lo >= hi:
+            return
+        high, low = bars["high"][lo:hi], bars["low"][lo:hi]
+        buy = order.side == "buy"
+
+        begin = 0
+        if order.type in ("stop", "stop_limit") and order.status != "triggered":
+            hit = np.flatnonzero(high >= order.stop_price if buy else low <= order.stop_price)
+            if len(hit) == 0:
+                return
+            begin = hit[0]
+            if order.type == "stop":
+                price = max(order.stop_price, bars["open"][lo + begin]) if buy else min(order.stop_price, bars["open"][lo + begin])
+                self._fill(order, float(price), bars["timestamp"][lo + begin] + MINUTE_NS)
+                return
+            order.status = "triggered"
+
+        hit = np.flatnonzero(low[begin:] <= order.limit_price if buy else high[begin:] >= order.limit_price)
+        if len(hit):
+            # A bar that opens through the limit fills at its open
+            i = lo + begin + hit[0]
+            opening = float(bars["open"][i])
+            price = min(order.limit_price, opening) if buy else max(order.limit_price, opening)
+            self._fill(order, price, bars["timestamp"][i] + MINUTE_NS)
+
+
+@contextmanager
+def order_helpers(broker):
+    """
+    Route the order.py helpers to the broker for the duration of the block.
+    order.py creates its TradingClient lazily, so this needs no credentials.
+    """
+    from src.order import order
+
+    previous = order.trading_client
+    order.trading_client = broker
+    try:
+        yield
+    finally:
+        order.trading_client = previous
+
+
+def replay(bot, broker, start=None, end=None, bar_minutes=None, quiet=True):
+    """
+    Run the bot's unmodified run_strategy on the broker's virtual clock.
+
+    The bot is pointed at the broker for market data, account and orders,
+    with a snapshot cache that never serves a stale virtual price.
+
+    Returns:
+    - (decision times, equity after each decision, broker.orders)
+    """
+    # Bots built with api=broker need no credentials; others are repointed
+    bot.api = broker
+    bot.order_manager = None
+    bot.snapshots = SnapshotService(broker, [bot.symbol], max_age=0)
+
+    times = broker.decision_times(start, end, bar_minutes)
+    equity = np.empty(len(times))
+    with order_helpers(broker):
+        for i, t in enumerate(times):
+            broker.advance(t)
+            with redirect_stdout(io.StringIO()) if quiet else nullcontext():
+                bot.run_strategy()
+            equity[i] = broker.equity()
+    return np.array(times, dtype=np.int64), equity, broker.orders
+
+
+def print_replay(times, equity, orders, initial_cash):
+    first, last = (np.datetime64(int(ns), "ns").astype("datetime64[D]") for ns in (times[0], times[-1]))
+    print(f"Replayed {len(times)} decisions from {first} to {last}")
+    for order in orders:
+        print(f"{order.filled_at or order.submitted_at}: {order.side.upper()} {order.qty:g} {order.symbol} @ {order.filled_avg_price} ({order.status})")
+    print(f"Final Equity: ${equity[-1]:.2f}")
+    print(f"Total Return: {(equity[-1] / initial_cash - 1) * 100:.2f}%")
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Points kept per line; about one per horizontal pixel of a saved 12in figure
+DEFAULT_POINTS = 2000
+
+# Single background thread so plotting never blocks a backtest
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plotting")
+
+
+def _numeric(x):
+    """x as float64 for the downsampling geometry, datetimes as epoch nanoseconds."""
+    if isinstance(x, pd.DatetimeIndex):
+        return x.asi8.astype(np.float64)
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        return x.view("int64").astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out=DEFAULT_POINTS):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _numeric(x)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        next_y = y[next_lo:next_hi]
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[a] if np.isnan(next_y).all() else np.nanmean(next_y)
+
+        # Keep the point forming the largest triangle with the last kept point
+        # and the average of the next bucket
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        area[np.isnan(area)] = -1
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+
+    return idx
+
+
+def minmax_indices(y, n_buckets=DEFAULT_POINTS // 2):
+    """Indices of the min and max point in each of n_buckets equal buckets."""
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lows = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    idx = np.unique(np.concatenate([lows, highs]))
+    return idx[idx < n]
+
+
+def downsample(x, y, n_out=DEFAULT_POINTS, method="lttb"):
+    """Shape-preserving downsample of a line to at most about n_out points."""
+    if method == "lttb":
+        idx = lttb_indices(x, y, n_out)
+    elif method == "minmax":
+        idx = minmax_indices(y, n_out // 2)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return x[idx], np.asarray(y)[idx]
+
+
+def render(filename, panels, figsize=(12, 8), n_out=DEFAULT_POINTS, method="lttb"):
+    """
+    Downsample and draw line panels to an image file without a display.
+
+    Parameters:
+    - panels: List of dicts with 'title', 'ylabel' and 'lines', where each line
+      is an (x, y, kwargs) tuple passed to Axes.plot. 'xlabel' is optional.
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    for i, panel in enumerate(panels):
+        ax = fig.add_subplot(len(panels), 1, i + 1)
+        for x, y, kwargs in panel["lines"]:
+            ax.plot(*downsample(x, y, n_out, method), **kwargs)
+        ax.set_title(panel["title"])
+        ax.set_ylabel(panel["ylabel"])
+        if "xlabel" in panel:
+            ax.set_xlabel(panel["xlabel"])
+        if any("label" in kwargs for _, _, kwargs in panel["lines"]):
+            ax.legend()
+        ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(filename)
+    return filename
+
+
+def render_async(filename, panels, **kwargs):
+    """Queue render() on the background plotting thread and return its Future."""
+    return _executor.submit(render, filename, panels, **kwargs)
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Bump whenever backtest logic changes so stale results are never served
+ENGINE_VERSION = "2"
+
+DEFAULT_CACHE_DIR = "src/backtest/cache/"
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+_METRICS_KEY = "__metrics__"
+
+
+def hash_file(filename, block_size=1 << 20):
+    """Content hash of a file, read in blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_arrays(*arrays):
+    """Content hash of NumPy arrays, including their dtypes and shapes."""
+    digest = hashlib.blake2b(digest_size=16)
+    for values in arrays:
+        values = np.ascontiguousarray(values)
+        digest.update(f"{values.dtype.str}{values.shape}".encode())
+        digest.update(values.data)
+    return digest.hexdigest()
+
+
+def hash_frame(df):
+    """Content hash of a DataFrame's index and values."""
+    return hash_arrays(pd.util.hash_pandas_object(df).to_numpy())
+
+
+def cache_key(data_hashes, params, engine_version=ENGINE_VERSION):
+    """Key a backtest by its input data hashes, strategy parameters and engine version."""
+    payload = json.dumps(
+        {"data": list(data_hashes), "params": params, "engine": engine_version},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of backtest outputs, one compressed .npz file per key.
+
+    Each entry holds the result arrays (equity curves etc.) plus a JSON blob of
+    metrics. Entries are touched on every hit and the least recently used are
+    evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Return (arrays, metrics) for a key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        os.utime(path)
+        metrics = json.loads(str(arrays.pop(_METRICS_KEY)))
+        return arrays, metrics
+
+    def put(self, key, arrays, metrics):
+        """Store result arrays and a dict of JSON-serialisable metrics under a key."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f, **arrays, **{_METRICS_KEY: np.array(json.dumps(metrics, default=float))}
+            )
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached (arrays, metrics) for key, running compute() on a miss."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        arrays, metrics = compute()
+        self.put(key, arrays, metrics)
+        return arrays, metrics
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,90 @@
+import math
+import numpy as np
+from src.backtest.result_cache import hash_arrays
+from src.backtest.sweep import evaluate_many, load_close, print_sweep
+
+
+def sample_windows(n, short_range=(2, 200), long_range=(20, 2000), seed=None):
+    """
+    n distinct (short, long) pairs with short < long, drawn log-uniformly so
+    small windows are sampled as densely (relatively) as large ones.
+    """
+    rng = np.random.default_rng(seed)
+    pairs = set()
+    while len(pairs) < n:
+        short, long_ = np.exp(
+            rng.uniform(np.log([short_range[0], long_range[0]]), np.log([short_range[1], long_range[1]]))
+        ).astype(int)
+        if short < long_:
+            pairs.add((int(short), int(long_)))
+    return sorted(pairs)
+
+
+def rung_budgets(n_bars, n_candidates, eta):
+    """
+    History lengths per rung, shortest first and ending at n_bars.
+
+    There are floor(log_eta(n_candidates)) + 1 rungs, each eta times longer
+    than the last, so the rung that starts with all candidates and the one
+    left with a single survivor each cost about one full-history backtest.
+    """
+    n_rungs = 1
+    while eta**n_rungs <= n_candidates:
+        n_rungs += 1
+    return [max(1, n_bars // eta ** (n_rungs - 1 - i)) for i in range(n_rungs)]
+
+
+def successive_halving(
+    close,
+    candidates,
+    eta=3,
+    metric="sharpe",
+    version=None,
+    cache=None,
+    max_workers=None,
+):
+    """
+    Successive halving over SMA window pairs.
+
+    Every candidate is scored on the first n_bars / eta**(rungs - 1) bars of
+    the history. The best 1/eta advance to a
+    history eta times longer, and so on until the survivors run over the
+    full history. With eta=3, 81 candidates go through five rungs
+    (81, 27, 9, 3 and 1 candidates), which is about five full-history
+    backtests of work and a single full-history run, against 81 for a grid.
+
+    Each evaluation is stored in the result cache under (data version,
+    windows, bars), so rerunning an interrupted search resumes where it
+    stopped.
+
+    Returns:
+    - (rows of (short, long, metrics) from the last rung, best first,
+       [(bars, candidates evaluated)] per rung).
+    """
+    version = version or hash_arrays(close)
+    survivors = list(candidates)
+    history = []
+    budgets = rung_budgets(len(close), len(survivors), eta)
+    for i, bars in enumerate(budgets):
+        results = evaluate_many(close, survivors, bars=bars, version=version, cache=cache, max_workers=max_workers)
+        history.append((bars, len(survivors)))
+        ranked = sorted(results.items(), key=lambda item: item[1][metric], reverse=True)
+        if i == len(budgets) - 1:
+            return [(s, l, m) for (s, l), m in ranked], history
+        survivors = [pair for pair, _ in ranked[: max(1, math.ceil(len(ranked) / eta))]]
+
+
+def print_history(history, n_bars):
+    print(f"\n{'bars':>10} {'candidates':>11}")
+    for bars, count in history:
+        print(f"{bars:>10} {count:>11}")
+    work = sum(bars * count for bars, count in history) / n_bars
+    print(f"Work: {work:.1f} full-history backtests vs {history[0][1]} for a grid")
+
+
+if __name__ == "__main__":
+    close, version = load_close("SPY")
+    candidates = sample_windows(81, seed=0)
+    rows, history = successive_halving(close, candidates, version=version)
+    print_history(history, len(close))
+    print_sweep(rows)
@@ -1,10 +1,16 @@
 import os
 import time
+import asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import alpaca_trade_api as tradeapi
 from alpaca_trade_api.rest import REST, TimeFrame
+from alpaca.trading.requests import MarketOrderRequest
+from alpaca.trading.enums import OrderSide, TimeInForce
+from src.backtest.result_cache import ResultCache, cache_key, hash_frame
+from src.strategy.signals import sma_crossover
+from src.stockinfo.snapshots import SnapshotService
 
 # API Configuration
 API_KEY = "YOUR_API_KEY"
@@ -13,9 +19,16 @@ BASE_URL = "https://paper-api.alpaca.markets"  # Using paper trading by default
 
 
 class SPYMovingAverageBot:
-    def __init__(self, api_key, api_secret, base_url):
-        self.api = tradeapi.REST(api_key, api_secret, base_url)
+    def __init__(
+        self, api_key, api_secret, base_url, order_manager=None, snapshots=None, api=None
+    ):
+        # Any object with the REST calls used here, e.g. a PaperBroker, can stand in
+        self.api = api or tradeapi.REST(api_key, api_secret, base_url)
+        # When set, positions and fills come from the trade-updates stream
+        self.order_manager = order_manager
         self.symbol = "SPY"
+        # Latest prices come from a shared in-memory snapshot cache
+        self.snapshots = snapshots or SnapshotService(self.api, [self.symbol])
         self.timeframe = TimeFrame.Day
         self.position = 0
         self.is_market_open = False
@@ -42,34 +55,21 @@ class SPYMovingAverageBot:
 
     def calculate_signals(self, data):
         """Calculate moving average signals"""
-        data["sma_20"] = data["close"].rolling(window=20).mean()
-        data["sma_50"] = data["close"].rolling(window=50).mean()
-        data["sma_100"] = data["close"].rolling(window=100).mean()
-
-        # Generate signals
-        # Buy when SMA20 crosses above SMA50 and both are above SMA100
+        # Buy when SMA20 crosses above SMA50 and SMA50 is above SMA100
         # Sell when SMA20 crosses below SMA50
-        data["signal"] = 0
-
-        # SMA20 crosses above SMA50
-        data.loc[
-            (data["sma_20"] > data["sma_50"])
-            & (data["sma_20"].shift(1) <= data["sma_50"].shift(1))
-            & (data["sma_50"] > data["sma_100"]),
-            "signal",
-        ] = 1
-
-        # SMA20 crosses below SMA50
-        data.loc[
-            (data["sma_20"] < data["sma_50"])
-            & (data["sma_20"].shift(1) >= data["sma_50"].shift(1)),
-            "signal",
-        ] = -1
+        outputs = sma_crossover(20, 50, 100).evaluate({"close": data["close"].to_numpy()})
+        for name, values in outputs.items():
+            data[name] = values
+        data["signal"] = data["signal"].astype(int)
 
         return data
 
     def get_current_position(self):
         """Get current position of SPY"""
+        if self.order_manager is not None:
+            self.position = int(self.order_manager.position(self.symbol))
+            return self.position
+
         try:
             position = self.api.get_position(self.symbol)
             self.position = int(position.qty)
@@ -80,42 +80,58 @@ class SPYMovingAverageBot:
 
     def get_buying_power(self):
         """Get current buying power"""
+        if self.order_manager is not None:
+            return self.order_manager.available_buying_power()
+
         account = self.api.get_account()
         return float(account.buying_power)
 
-    def execute_trade(self, signal):
-        """Execute trade based on signal"""
-        self.get_current_position()
+    def execute_trade(
+        self, signal, buying_power=None, latest_price=None, refresh_position=True
+    ):
+        """Execute trade based on signal, reusing any values already fetched"""
+        if refresh_position:
+            self.get_current_position()
 
         if signal == 1 and self.position <= 0:  # Buy signal
             # Calculate number of shares based on available buying power
-            buying_power = self.get_buying_power() * 0.95  # Using 95% of buying power
-            latest_price = self.api.get_latest_trade(self.symbol).price
+            if buying_power is None:
+                buying_power = self.get_buying_power()
+            buying_power *= 0.95  # Using 95% of buying power
+            if latest_price is None:
+                latest_price = self.snapshots.latest_price(self.symbol)
             shares_to_buy = int(buying_power / latest_price)
 
             if shares_to_buy > 0:
                 print(
                     f"BUY: Submitting order for {shares_to_buy} shares of {self.symbol}"
                 )
-                self.api.submit_order(
-                    symbol=self.symbol,
-                    qty=shares_to_buy,
-                    side="buy",
-                    type="market",
-                    time_in_force="day",
-                )
+                self.submit_market_order(shares_to_buy, "buy")
 
         elif signal == -1 and self.position > 0:  # Sell signal
             print(
                 f"SELL: Submitting order to sell {self.position} shares of {self.symbol}"
             )
-            self.api.submit_order(
-                symbol=self.symbol,
-                qty=self.position,
-                side="sell",
-                type="market",
-                time_in_force="day",
+            self.submit_market_order(self.position, "sell")
+
+    def submit_market_order(self, qty, side):
+        """Submit a day market order, through the order manager when there is one"""
+        if self.order_manager is not None:
+            return self.order_manager.submit_threadsafe(
+                MarketOrderRequest(
+                    symbol=self.symbol,
+                    qty=qty,
+                    side=OrderSide(side),
+                    time_in_force=TimeInForce.DAY,
+                )
             )
+        return self.api.submit_order(
+            symbol=self.symbol,
+            qty=qty,
+            side=side,
+            type="market",
+            time_in_force="day",
+        )
 
     def run_strategy(self):
         """Run the trading strategy"""
@@ -141,9 +157,71 @@ class SPYMovingAverageBot:
         else:
             print("No trading signal detected")
 
-    def run_backtest(self, initial_capital=10000.0):
+    async def run_strategy_async(self, bar_close=None):
+        """Run the trading strategy right after a bar close (see scheduler.run_live)"""
+        # Independent requests run concurrently; market hours come from the
+        # scheduler's cached calendar rather than a get_clock call
+        historical_data, _ = await asyncio.gather(
+            asyncio.to_thread(self.get_historical_data),
+            asyncio.to_thread(self.get_current_position),
+        )
+        signals = self.calculate_signals(historical_data)
+        latest_signal = signals["signal"].iloc[-1]
+
+        if latest_signal == 0:
+            print("No trading signal detected")
+            return
+
+        print(f"Signal detected: {latest_signal}")
+        buying_power = latest_price = None
+        if latest_signal == 1 and self.position <= 0:
+            buying_power, latest_price = await asyncio.gather(
+                asyncio.to_thread(self.get_buying_power),
+                asyncio.to_thread(self.snapshots.latest_price, self.symbol),
+            )
+        await asyncio.to_thread(
+            self.execute_trade,
+            latest_signal,
+            buying_power,
+            latest_price,
+            refresh_position=False,
+        )
+
+    def run_backtest(self, initial_capital=10000.0, cache=None):
         """Run a backtest on historical data"""
         data = self.get_historical_data(days=365)  # Get a year of data
+
+        # Reuse the stored result if these exact bars were already backtested
+        cache = cache or ResultCache()
+        key = cache_key(
+            [hash_frame(data)],
+            {"strategy": "sma_backtest", "symbol": self.symbol},
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            arrays, metrics = cached
+            index = pd.to_datetime(arrays.pop("index"), utc=True)
+            signals = pd.DataFrame(arrays, index=index)
+        else:
+            signals, metrics = self.compute_backtest(data)
+            arrays = {
+                column: signals[column].to_numpy()
+                for column in signals.select_dtypes("number").columns
+            }
+            cache.put(key, {"index": signals.index.asi8, **arrays}, metrics)
+
+        total_return = metrics["total_return"]
+        print(f"Backtest Results for SPY Moving Average Strategy:")
+        print(f"Period: {signals.index[0].date()} to {signals.index[-1].date()}")
+        print(f"Initial Capital: ${initial_capital:.2f}")
+        print(f"Final Capital: ${initial_capital * total_return:.2f}")
+        print(f"Total Return: {(total_return - 1) * 100:.2f}%")
+        print(f"Sharpe Ratio: {metrics['sharpe_ratio']:.4f}")
+
+        return signals
+
+    def compute_backtest(self, data):
+        """Compute strategy returns and metrics for a set of bars"""
         signals = self.calculate_signals(data)
 
         # Add columns for backtest
@@ -158,21 +236,16 @@ class SPYMovingAverageBot:
         ).cumprod()
 
         # Calculate metrics
-        total_return = signals["cumulative_strategy_returns"].iloc[-1]
-        sharpe_ratio = (
-            signals["strategy_returns"].mean()
-            / signals["strategy_returns"].std()
-            * np.sqrt(252)
-        )
+        metrics = {
+            "total_return": float(signals["cumulative_strategy_returns"].iloc[-1]),
+            "sharpe_ratio": float(
+                signals["strategy_returns"].mean()
+                / signals["strategy_returns"].std()
+                * np.sqrt(252)
+            ),
+        }
 
-        print(f"Backtest Results for SPY Moving Average Strategy:")
-        print(f"Period: {signals.index[0].date()} to {signals.index[-1].date()}")
-        print(f"Initial Capital: ${initial_capital:.2f}")
-        print(f"Final Capital: ${initial_capital * total_return:.2f}")
-        print(f"Total Return: {(total_return - 1) * 100:.2f}%")
-        print(f"Sharpe Ratio: {sharpe_ratio:.4f}")
-
-        return signals
+        return signals, metrics
 
 
 if __name__ == "__main__":
@@ -182,12 +255,6 @@ if __name__ == "__main__":
     # Run backtest
     backtest_results = bot.run_backtest()
 
-    # # Run live trading
-    # while True:
-    #     try:
-    #         bot.run_strategy()
-    #         # Wait for 1 hour before checking again
-    #         time.sleep(3600)
-    #     except Exception as e:
-    #         print(f"Error: {e}")
-    #         time.sleep(60)  # Wait a minute if there's an error
+    # # Run live trading, evaluating right after each daily bar close
+    # from src.strategy.scheduler import run_live
+    # asyncio.run(run_live(bot))
@@ -0,0 +1,133 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from src.backtest.bootstrap import MINUTE_PERIODS_PER_YEAR, path_metrics
+from src.backtest.result_cache import ResultCache, cache_key, hash_arrays
+from src.data.bar_store import BarStore
+from src.data.shared_bars import SharedBarStore, attach
+from src.strategy.signals import sma_regime
+
+# Zero-copy view of the shared close prices, set once per process by _init_worker
+_CLOSE = None
+
+
+def load_close(symbol, store=None):
+    """
+    Close prices for a symbol from the bar store, with a data version for cache keys.
+
+    Returns:
+    - (close array, version string)
+    """
+    store = store or BarStore()
+    close = store.read(symbol, ["close"])["close"]
+    if len(close) == 0:
+        raise ValueError(f"No bars stored for {symbol}; run the ingest first")
+    return close, store.version(symbol)
+
+
+def strategy_returns(close, short_window, long_window):
+    """Per-bar returns of the SMA regime rule, long while short > long, else flat."""
+    position = sma_regime(short_window, long_window).evaluate({"close": close})["signal"] == 1
+    returns = np.zeros(len(close))
+    returns[1:] = position[:-1] * (close[1:] / close[:-1].astype(np.float64) - 1)
+    return returns
+
+
+def evaluate_sma(close, short_window, long_window, periods_per_year=MINUTE_PERIODS_PER_YEAR):
+    """Sharpe, max drawdown and total return of the SMA regime rule on close."""
+    metrics = path_metrics(strategy_returns(close, short_window, long_window)[None, :], periods_per_year)
+    return {name: float(values[0]) for name, values in metrics.items()}
+
+
+def sweep_key(version, short_window, long_window, bars):
+    return cache_key(
+        [version],
+        {
+            "strategy": "sma_regime",
+            "short_window": short_window,
+            "long_window": long_window,
+            "bars": bars,
+        },
+    )
+
+
+def _init_worker(handle):
+    global _CLOSE
+    _CLOSE = attach(handle)["close"]
+
+
+def _evaluate(short_window, long_window, bars, periods_per_year):
+    return evaluate_sma(_CLOSE[:bars], short_window, long_window, periods_per_year)
+
+
+def evaluate_many(
+    close,
+    candidates,
+    bars=None,
+    version=None,
+    cache=None,
+    max_workers=None,
+    periods_per_year=MINUTE_PERIODS_PER_YEAR,
+):
+    """
+    Evaluate (short, long) window pairs on the first `bars` bars of close.
+
+    Pairs already in the result cache are served from it; the rest run on a
+    process pool that maps close from shared memory.
+
+    Returns:
+    - {(short, long): metrics}
+    """
+    bars = bars or len(close)
+    version = version or hash_arrays(close)
+    cache = cache or ResultCache()
+    results = {}
+    todo = []
+    for pair in candidates:
+        cached = cache.get(sweep_key(version, *pair, bars))
+        if cached is not None:
+            results[pair] = cached[1]
+        else:
+            todo.append(pair)
+
+    if todo:
+        with SharedBarStore() as store, ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(store.publish("close", {"close": close}),),
+        ) as executor:
+            futures = {
+                pair: executor.submit(_evaluate, *pair, bars, periods_per_year)
+                for pair in todo
+            }
+            for pair, future in futures.items():
+                results[pair] = future.result()
+                cache.put(sweep_key(version, *pair, bars), {}, results[pair])
+
+    print(f"Evaluated {len(todo)} of {len(results)} candidates ({len(results) - len(todo)} cached)")
+    return results
+
+
+def grid_sweep(close, shorts, longs, version=None, cache=None, max_workers=None):
+    """
+    Evaluate every short < long window pair over the full history.
+
+    Returns:
+    - Rows of (short, long, metrics), best Sharpe first.
+    """
+    candidates = [(s, l) for s in shorts for l in longs if s < l]
+    results = evaluate_many(close, candidates, version=version, cache=cache, max_workers=max_workers)
+    return sorted(
+        ((s, l, m) for (s, l), m in results.items()),
+        key=lambda row: row[2]["sharpe"],
+        reverse=True,
+    )
+
+
+def print_sweep(rows, top=10):
+    print(f"\n{'short':>6} {'long':>6} {'sharpe':>8} {'return':>9} {'drawdown':>9}")
+    for short_window, long_window, metrics in rows[:top]:
+        print(
+            f"{short_window:>6} {long_window:>6} {metrics['sharpe']:>8.3f} "
+            f"{metrics['total_return'] * 100:>8.2f}% {metrics['max_drawdown'] * 100:>8.2f}%"
+        )
@@ -0,0 +1,182 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from src.backtest.bootstrap import MINUTE_PERIODS_PER_YEAR, path_metrics
+from src.data.bar_store import BarStore
+from src.data.shared_bars import SharedBarStore, attach
+
+# Zero-copy views of the shared close prices and their prefix sums, set once
+# per process by _init_worker
+_SHARED = None
+
+
+def month_bounds(timestamps):
+    """Index of the first bar of every calendar month, plus len(timestamps)."""
+    months = timestamps.astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+    starts = np.flatnonzero(np.diff(months)) + 1
+    return np.concatenate(([0], starts, [len(timestamps)]))
+
+
+def make_folds(timestamps, train_months=12, test_months=1):
+    """
+    Rolling (train_start, test_start, test_stop) bar indices.
+
+    Each fold trains on train_months whole months and tests on the
+    test_months that follow; the next fold steps forward by test_months, so
+    the test periods tile the history without overlap.
+    """
+    bounds = month_bounds(timestamps)
+    return [
+        (int(bounds[i - train_months]), int(bounds[i]), int(bounds[i + test_months]))
+        for i in range(train_months, len(bounds) - test_months, test_months)
+    ]
+
+
+def prefix_sums(close):
+    """csum[i] is the sum of close[:i] in float64, so any SMA is one subtraction."""
+    csum = np.zeros(len(close) + 1)
+    np.cumsum(close, dtype=np.float64, out=csum[1:])
+    return csum
+
+
+def window_sma(csum, window, start, stop):
+    """SMA at bars [start, stop) from prefix sums, NaN before a full window."""
+    out = np.full(stop - start, np.nan)
+    first = max(start, window - 1)
+    if first < stop:
+        out[first - start:] = (
+            csum[first + 1 : stop + 1] - csum[first + 1 - window : stop + 1 - window]
+        ) / window
+    return out
+
+
+def range_returns(close, csum, pairs, start, stop):
+    """
+    Per-bar returns over bars [start, stop) of the SMA regime rule for each
+    (short, long) pair, one row per pair.
+
+    The position held into bar t is decided at bar t - 1's close, using SMAs
+    over all history up to then, so a fold needs no warm-up of its own.
+    """
+    first = max(start, 1)
+    prices = close[first - 1 : stop].astype(np.float64)
+    bar_returns = prices[1:] / prices[:-1] - 1
+    # Rounded to float32 like the indicator graph's SMAs, so crossovers land
+    # on the same bars as in sweep and the backtests
+    smas = {
+        window: window_sma(csum, window, first - 1, stop - 1).astype(np.float32)
+        for window in {w for pair in pairs for w in pair}
+    }
+    out = np.empty((len(pairs), stop - first))
+    for i, (short_window, long_window) in enumerate(pairs):
+        out[i] = (smas[short_window] > smas[long_window]) * bar_returns
+    return out
+
+
+def _init_worker(handle):
+    global _SHARED
+    _SHARED = attach(handle)
+
+
+def _run_fold(fold, pairs, metric, periods_per_year):
+    """Pick the best pair on the train range and score it on the test range."""
+    train_start, test_start, test_stop = fold
+    close, csum = _SHARED["close"], _SHARED["csum"]
+    train = path_metrics(range_returns(close, csum, pairs, train_start, test_start), periods_per_year)
+    best = int(np.argmax(train[metric]))
+    test_returns = range_returns(close, csum, [pairs[best]], test_start, test_stop)
+    test = path_metrics(test_returns, periods_per_year)
+    return (
+        pairs[best],
+        {name: float(values[best]) for name, values in train.items()},
+        {name: float(values[0]) for name, values in test.items()},
+        test_returns[0],
+    )
+
+
+def walk_forward(
+    timestamps,
+    close,
+    pairs,
+    train_months=12,
+    test_months=1,
+    metric="sharpe",
+    max_workers=None,
+    periods_per_year=MINUTE_PERIODS_PER_YEAR,
+):
+    """
+    Walk-forward optimisation of the SMA regime windows.
+
+    Close prices and their prefix sums are computed once and shared with the
+    workers; every fold's SMAs, for any window, are then differences of the
+    prefix sums rather than fresh rolling means over the overlapping train
+    ranges. Folds run in parallel.
+
+    Returns:
+    - (fold rows, stitched out-of-sample returns, out-of-sample metrics)
+    """
+    folds = make_folds(timestamps, train_months, test_months)
+    if not folds:
+        raise ValueError(f"Need more than {train_months + test_months} months of bars")
+    pairs = [tuple(pair) for pair in pairs]
+
+    with SharedBarStore() as store, ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(store.publish("walkforward", {"close": close, "csum": prefix_sums(close)}),),
+    ) as executor:
+        outcomes = list(
+            executor.map(
+                _run_fold,
+                folds,
+                [pairs] * len(folds),
+                [metric] * len(folds),
+                [periods_per_year] * len(folds),
+            )
+        )
+
+    rows = [
+        {
+            "train_start": timestamps[train_start],
+            "test_start": timestamps[test_start],
+            "test_end": timestamps[test_stop - 1],
+            "short_window": pair[0],
+            "long_window": pair[1],
+            "train": train,
+            "test": test,
+        }
+        for (train_start, test_start, test_stop), (pair, train, test, _) in zip(folds, outcomes)
+    ]
+    oos_returns = np.concatenate([outcome[3] for outcome in outcomes])
+    oos = path_metrics(oos_returns[None, :], periods_per_year)
+    return rows, oos_returns, {name: float(values[0]) for name, values in oos.items()}
+
+
+def run_walk_forward(symbol, shorts, longs, store=None, **kwargs):
+    """walk_forward over a symbol's full history in the bar store."""
+    store = store or BarStore()
+    bars = store.read(symbol, ["timestamp", "close"])
+    if len(bars["close"]) == 0:
+        raise ValueError(f"No bars stored for {symbol}; run the ingest first")
+    pairs = [(s, l) for s in shorts for l in longs if s < l]
+    return walk_forward(bars["timestamp"], bars["close"], pairs, **kwargs)
+
+
+def print_walk_forward(rows, metrics):
+    def day(ts):
+        return np.datetime64(int(ts), "ns").astype("datetime64[D]")
+
+    print(f"\n{'test from':>10} {'to':>10} {'short':>6} {'long':>6} {'train sharpe':>13} {'test sharpe':>12} {'test return':>12}")
+    for row in rows:
+        print(
+            f"{day(row['test_start'])} {day(row['test_end'])} {row['short_window']:>6} {row['long_window']:>6} "
+            f"{row['train']['sharpe']:>13.3f} {row['test']['sharpe']:>12.3f} {row['test']['total_return'] * 100:>11.2f}%"
+        )
+    print(f"\nOut-of-sample Sharpe Ratio: {metrics['sharpe']:.4f}")
+    print(f"Out-of-sample Total Return: {metrics['total_return'] * 100:.2f}%")
+    print(f"Out-of-sample Maximum Drawdown: {metrics['max_drawdown'] * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    rows, _, metrics = run_walk_forward("SPY", [5, 10, 20, 50], [50, 100, 200, 400])
+    print_walk_forward(rows, metrics)
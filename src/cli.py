@@ -0,0 +1,290 @@
+"""
+algoapex command line.
+
+Each subcommand imports only the modules it needs inside its handler, so
+quick commands like `positions` don't pay for pandas, matplotlib or the
+data SDK. Run as `python main.py <command>` or `python -m src.cli <command>`.
+"""
+import argparse
+import sys
+
+
+def _windows(text):
+    return [int(w) for w in text.split(",")]
+
+
+def cmd_overview(args):
+    from src.stockinfo import spy
+    from src.account import positions, info
+
+    spy.getSPY()
+    positions.getall()
+    info.print_info()
+
+
+def cmd_quote(args):
+    from src.stockinfo.snapshots import default_service
+
+    prices = default_service().prices(args.symbols)
+    for symbol, price in prices.items():
+        print(f"{symbol}: {price}")
+
+
+def cmd_positions(args):
+    from src.account import positions
+
+    positions.getall()
+
+
+def cmd_account(args):
+    from src.account import info
+
+    info.print_info()
+
+
+def cmd_fetch(args):
+    from src.data.parallel_data_getter import (
+        DIRECTORY_PREFIX,
+        TIMEFRAME,
+        get_historical_data_parallel,
+    )
+
+    filename = f"{DIRECTORY_PREFIX}{args.symbol}_all_data_{args.start}_to_{args.end}.csv"
+    get_historical_data_parallel(
+        filename,
+        args.symbol,
+        args.start,
+        args.end,
+        TIMEFRAME,
+        chunk_size=1,
+        max_workers=args.workers,
+    )
+
+
+def cmd_ingest(args):
+    from src.data.bar_store import BarStore
+    from src.data.ingest import (
+        default_calendar,
+        find_archives,
+        ingest_csv,
+        print_report,
+        write_gap_report,
+    )
+
+    store = BarStore()
+    calendar = default_calendar()
+    for filename in args.files or find_archives():
+        report = ingest_csv(filename, store, calendar=calendar)
+        print_report(report)
+        write_gap_report(report)
+
+
+def cmd_features(args):
+    from src.data.bar_store import BarStore
+    from src.data.feature_store import materialize_many
+    from src.strategy.signals import sma_crossover, sma_regime
+
+    features = {}
+    pairs = [(s, l) for s in args.short for l in args.long if s < l]
+    for short_window, long_window in pairs:
+        for name, node in sma_regime(short_window, long_window).outputs.items():
+            features[f"{name}_{short_window}_{long_window}"] = node
+    features.update(sma_crossover().outputs)
+    symbols = args.symbols or BarStore().symbols()
+    for symbol, computed in materialize_many(symbols, features, max_workers=args.workers).items():
+        print(f"{symbol}: {computed} feature partitions computed")
+
+
+def cmd_backtest(args):
+    from src.backtest import backtest_ma
+
+    results, metrics = backtest_ma.run(
+        args.data or backtest_ma.DATA_FILENAME,
+        args.short,
+        args.long,
+        args.capital,
+    )
+    print(f"Final Capital: ${metrics['final_capital']:.2f}")
+    print(f"Total Return: {metrics['total_return'] * 100:.2f}%")
+    print(f"Buy & Hold Return: {metrics['buy_hold_return'] * 100:.2f}%")
+    print(f"Maximum Drawdown: {metrics['max_drawdown'] * 100:.2f}%")
+
+    if args.plot:
+        from src.backtest.plotting import render
+
+        render(
+            backtest_ma.PLOT_FILENAME,
+            [
+                {
+                    "title": "Backtest: Moving Average Strategy vs. Buy & Hold",
+                    "ylabel": "Portfolio Value ($)",
+                    "lines": [
+                        (results["index"], results["Strategy Capital"], {"label": "Strategy Performance"}),
+                        (results["index"], results["Buy & Hold"], {"label": "Buy & Hold Performance"}),
+                    ],
+                }
+            ],
+            figsize=(12, 6),
+        )
+        print(f"\nBacktest plot saved as '{backtest_ma.PLOT_FILENAME}'")
+
+
+def cmd_sweep(args):
+    from src.backtest.sweep import grid_sweep, load_close, print_sweep
+
+    close, version = load_close(args.symbol)
+    rows = grid_sweep(close, args.short, args.long, version=version, max_workers=args.workers)
+    print_sweep(rows, args.top)
+
+
+def cmd_search(args):
+    from src.backtest.search import print_history, sample_windows, successive_halving
+    from src.backtest.sweep import load_close, print_sweep
+
+    close, version = load_close(args.symbol)
+    candidates = sample_windows(args.candidates, seed=args.seed)
+    rows, history = successive_halving(
+        close, candidates, eta=args.eta, version=version, max_workers=args.workers
+    )
+    print_history(history, len(close))
+    print_sweep(rows, args.top)
+
+
+def cmd_walkforward(args):
+    from src.backtest.walkforward import print_walk_forward, run_walk_forward
+
+    rows, _, metrics = run_walk_forward(
+        args.symbol,
+        args.short,
+        args.long,
+        train_months=args.train_months,
+        test_months=args.test_months,
+        max_workers=args.workers,
+    )
+    print_walk_forward(rows, metrics)
+
+
+def cmd_replay(args):
+    import pandas as pd
+    from src.backtest.paper_broker import PaperBroker, print_replay, replay
+    from src.strategy.sma import SPYMovingAverageBot
+
+    # The bot looks back a year of daily bars, so load history before start
+    history_start = (pd.Timestamp(args.start, tz="UTC") - pd.Timedelta(days=400)).value
+    broker = PaperBroker.from_store(
+        ["SPY"], start=history_start, initial_cash=args.cash, slippage_bps=args.slippage_bps
+    )
+    bot = SPYMovingAverageBot(None, None, None, api=broker)
+    times, equity, orders = replay(
+        bot, broker, args.start, args.end, bar_minutes=args.bar_minutes, quiet=not args.verbose
+    )
+    print_replay(times, equity, orders, args.cash)
+
+
+def cmd_live(args):
+    import asyncio
+    from src.strategy.sma import API_KEY, API_SECRET, BASE_URL, SPYMovingAverageBot
+    from src.strategy.scheduler import run_live
+
+    from src.stockinfo.snapshots import default_service
+
+    order_manager = None
+    if args.stream_orders:
+        from src.order.order_manager import OrderManager
+
+        order_manager = OrderManager(API_KEY, API_SECRET, paper=True)
+    bot = SPYMovingAverageBot(
+        API_KEY, API_SECRET, BASE_URL, order_manager=order_manager, snapshots=default_service()
+    )
+    asyncio.run(run_live(bot, bar_minutes=args.bar_minutes))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="algoapex")
+    commands = parser.add_subparsers(dest="command")
+
+    quote = commands.add_parser("quote", help="Print latest prices from one snapshot request")
+    quote.add_argument("symbols", nargs="+")
+    quote.set_defaults(func=cmd_quote)
+
+    commands.add_parser("positions", help="Print open positions").set_defaults(func=cmd_positions)
+    commands.add_parser("account", help="Print account balances").set_defaults(func=cmd_account)
+
+    fetch = commands.add_parser("fetch", help="Download minute bars to a CSV")
+    fetch.add_argument("symbol")
+    fetch.add_argument("start", help="YYYY-MM-DD")
+    fetch.add_argument("end", help="YYYY-MM-DD")
+    fetch.add_argument("--workers", type=int, default=6)
+    fetch.set_defaults(func=cmd_fetch)
+
+    ingest = commands.add_parser("ingest", help="Load stored CSVs into the bar store")
+    ingest.add_argument("files", nargs="*", help="Defaults to every archive in stored_data")
+    ingest.set_defaults(func=cmd_ingest)
+
+    features = commands.add_parser("features", help="Precompute indicator features from the bar store")
+    features.add_argument("symbols", nargs="*", help="Defaults to every stored symbol")
+    features.add_argument("--short", type=_windows, default=[10])
+    features.add_argument("--long", type=_windows, default=[100])
+    features.add_argument("--workers", type=int)
+    features.set_defaults(func=cmd_features)
+
+    backtest = commands.add_parser("backtest", help="Run the moving average backtest")
+    backtest.add_argument("--data", help="Stored CSV to backtest")
+    backtest.add_argument("--short", type=int, default=10)
+    backtest.add_argument("--long", type=int, default=100)
+    backtest.add_argument("--capital", type=float, default=100000000)
+    backtest.add_argument("--plot", action="store_true")
+    backtest.set_defaults(func=cmd_backtest)
+
+    sweep = commands.add_parser("sweep", help="Grid search SMA windows on stored bars")
+    sweep.add_argument("symbol")
+    sweep.add_argument("--short", type=_windows, default=[5, 10, 20, 50])
+    sweep.add_argument("--long", type=_windows, default=[50, 100, 200, 400])
+    sweep.add_argument("--workers", type=int)
+    sweep.add_argument("--top", type=int, default=10)
+    sweep.set_defaults(func=cmd_sweep)
+
+    search = commands.add_parser("search", help="Successive halving search over SMA windows")
+    search.add_argument("symbol")
+    search.add_argument("--candidates", type=int, default=81)
+    search.add_argument("--eta", type=int, default=3)
+    search.add_argument("--seed", type=int, default=0)
+    search.add_argument("--workers", type=int)
+    search.add_argument("--top", type=int, default=10)
+    search.set_defaults(func=cmd_search)
+
+    walkforward = commands.add_parser("walkforward", help="Walk-forward optimise SMA windows")
+    walkforward.add_argument("symbol")
+    walkforward.add_argument("--short", type=_windows, default=[5, 10, 20, 50])
+    walkforward.add_argument("--long", type=_windows, default=[50, 100, 200, 400])
+    walkforward.add_argument("--train-months", type=int, default=12)
+    walkforward.add_argument("--test-months", type=int, default=1)
+    walkforward.add_argument("--workers", type=int)
+    walkforward.set_defaults(func=cmd_walkforward)
+
+    replay = commands.add_parser("replay", help="Dry-run the SPY bot on stored bars with a local broker")
+    replay.add_argument("start", help="YYYY-MM-DD")
+    replay.add_argument("end", nargs="?", help="YYYY-MM-DD, defaults to the last stored bar")
+    replay.add_argument("--bar-minutes", type=int, help="Run every N minutes instead of before each close")
+    replay.add_argument("--cash", type=float, default=100000.0)
+    replay.add_argument("--slippage-bps", type=float, default=0.0)
+    replay.add_argument("--verbose", action="store_true", help="Show the bot's own output")
+    replay.set_defaults(func=cmd_replay)
+
+    live = commands.add_parser("live", help="Run the SPY bot on bar closes")
+    live.add_argument("--bar-minutes", type=int, help="Evaluate every N minutes instead of at the daily close")
+    live.add_argument("--stream-orders", action="store_true", help="Track fills from the trade-updates stream")
+    live.set_defaults(func=cmd_live)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # With no subcommand, print the same overview main.py always has
+    func = getattr(args, "func", cmd_overview)
+    func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
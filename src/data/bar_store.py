@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+DEFAULT_STORE_DIR = "src/data/stored_data/bars/"
+
+# Fixed on-disk dtypes; timestamps are UTC epoch nanoseconds
+BAR_DTYPES = {
+    "timestamp": np.int64,
+    "open": np.float32,
+    "high": np.float32,
+    "low": np.float32,
+    "close": np.float32,
+    "volume": np.int32,
+    "trade_count": np.int32,
+    "vwap": np.float32,
+}
+
+
+def partition_of(timestamps):
+    """Yearly partition label for each UTC nanosecond timestamp."""
+    years = timestamps.astype("datetime64[ns]").astype("datetime64[Y]").astype(np.int64)
+    return years + 1970
+
+
+class BarStore:
+    """
+    Binary bar store, one directory per symbol and one per yearly partition.
+
+    Each column is a plain .npy file so partitions can be memory-mapped, and a
+    per-symbol manifest.json records row counts, time bounds and a content
+    hash for every partition. Writes merge with what is already on disk,
+    keeping rows sorted by timestamp with the newest copy of any duplicate.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol)
+
+    def _manifest_path(self, symbol):
+        return os.path.join(self._symbol_dir(symbol), "manifest.json")
+
+    def symbols(self):
+        """Symbols that have at least one partition."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.root)
+            if os.path.exists(self._manifest_path(name))
+        )
+
+    def manifest(self, symbol):
+        """Partition metadata for a symbol, empty if nothing is stored."""
+        try:
+            with open(self._manifest_path(symbol)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"partitions": {}}
+
+    def partitions(self, symbol):
+        """Stored partition labels for a symbol, oldest first."""
+        return sorted(self.manifest(symbol)["partitions"], key=int)
+
+    def version(self, symbol):
+        """Hash of every partition hash, changing whenever any stored bar does."""
+        partitions = self.manifest(symbol)["partitions"]
+        digest = hashlib.blake2b(digest_size=16)
+        for label in sorted(partitions, key=int):
+            digest.update(f"{label}:{partitions[label]['hash']};".encode())
+        return digest.hexdigest()
+
+    def read_partition(self, symbol, partition, columns=None, mmap=True):
+        """Columns of one partition, memory-mapped read-only by default."""
+        directory = os.path.join(self._symbol_dir(symbol), str(partition))
+        return {
+            name: np.load(
+                os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None
+            )
+            for name in (columns or BAR_DTYPES)
+        }
+
+    def read(self, symbol, columns=None, start=None, end=None):
+        """Concatenated columns across partitions, optionally limited to [start, end) ns."""
+        columns = list(columns or BAR_DTYPES)
+        labels = self.partitions(symbol)
+        if start is not None:
+            first = partition_of(np.array([start]))[0]
+            labels = [p for p in labels if int(p) >= first]
+        if end is not None:
+            last = partition_of(np.array([end]))[0]
+            labels = [p for p in labels if int(p) <= last]
+
+        read_columns = columns if "timestamp" in columns else ["timestamp", *columns]
+        parts = [self.read_partition(symbol, p, read_columns) for p in labels]
+        if not parts:
+            return {name: np.empty(0, dtype=BAR_DTYPES[name]) for name in columns}
+
+        out = {name: np.concatenate([part[name] for part in parts]) for name in read_columns}
+        if start is not None or end is not None:
+            ts = out["timestamp"]
+            lo = 0 if start is None else np.searchsorted(ts, start, side="left")
+            hi = len(ts) if end is None else np.searchsorted(ts, end, side="left")
+            out = {name: values[lo:hi] for name, values in out.items()}
+        return {name: out[name] for name in columns}
+
+    def write_partition(self, symbol, partition, arrays):
+        """
+        Merge new rows into one partition.
+
+        Returns:
+        - The number of incoming rows dropped as duplicate timestamps.
+        """
+        directory = os.path.join(self._symbol_dir(symbol), str(partition))
+        arrays = {
+            name: np.asarray(arrays[name], dtype=dtype)
+            for name, dtype in BAR_DTYPES.items()
+            if name in arrays
+        }
+        incoming = len(arrays["timestamp"])
+
+        if os.path.isdir(directory):
+            existing = self.read_partition(symbol, partition, mmap=False)
+            # Existing rows first so the stable sort keeps incoming rows last
+            arrays = {
+                name: np.concatenate(
+                    [existing[name], arrays.get(name, _missing(name, incoming))]
+                )
+                for name in BAR_DTYPES
+            }
+        else:
+            arrays = {
+                name: arrays.get(name, _missing(name, incoming)) for name in BAR_DTYPES
+            }
+        total = len(arrays["timestamp"])
+
+        order = np.argsort(arrays["timestamp"], kind="stable")
+        ts = arrays["timestamp"][order]
+        keep = np.ones(len(ts), dtype=bool)
+        keep[:-1] = ts[1:] != ts[:-1]
+        order = order[keep]
+        arrays = {name: values[order] for name, values in arrays.items()}
+
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.blake2b(digest_size=16)
+        for name, values in arrays.items():
+            path = os.path.join(directory, f"{name}.npy")
+            with open(f"{path}.tmp", "wb") as f:
+                np.save(f, values)
+            os.replace(f"{path}.tmp", path)
+            digest.update(values.data)
+
+        manifest = self.manifest(symbol)
+        manifest["partitions"][str(partition)] = {
+            "rows": int(len(arrays["timestamp"])),
+            "start": int(arrays["timestamp"][0]),
+            "end": int(arrays["timestamp"][-1]),
+            "hash": digest.hexdigest(),
+        }
+        path = self._manifest_path(symbol)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+        # Stored partitions never hold duplicates, so every dropped row was incoming
+        return total - len(order)
+
+    def append(self, symbol, arrays):
+        """
+        Split rows by partition and merge each into the store.
+
+        Returns:
+        - The number of incoming rows dropped as duplicate timestamps.
+        """
+        ts = np.asarray(arrays["timestamp"], dtype=np.int64)
+        labels = partition_of(ts)
+        dropped = 0
+        for label in np.unique(labels):
+            mask = labels == label
+            dropped += self.write_partition(
+                symbol, int(label), {name: np.asarray(values)[mask] for name, values in arrays.items()}
+            )
+        return dropped
+
+
+def _missing(name, length):
+    """Filler for a column absent from incoming rows."""
+    if np.issubdtype(BAR_DTYPES[name], np.floating):
+        return np.full(length, np.nan, dtype=BAR_DTYPES[name])
+    return np.zeros(length, dtype=BAR_DTYPES[name])
@@ -112,18 +112,19 @@ DATA_FILENAME = (
 INVALID_DATES_FILENAME = f"{DIRECTORY_PREFIX}{symbol}_invalid_dates_start_date{START_DATE}_end_date{END_DATE}.csv"
 
 
-# Check if file exists, fetch if not
-if os.path.exists(DATA_FILENAME):
-    print(f"Loading data from {DATA_FILENAME}")
-    extracted_all_data = pd.read_csv(DATA_FILENAME, index_col=0, parse_dates=True)
-    print("Number of bars in loaded content: " + str(len(extracted_all_data)))
-else:
-    print(f"Fetching new data for {symbol}")
-    extracted_all_data = get_historical_data(
-        DATA_FILENAME,
-        symbol,
-        START_DATE,
-        END_DATE,
-        TIMEFRAME,
-        chunk_size=1,
-    )
+if __name__ == "__main__":
+    # Check if file exists, fetch if not
+    if os.path.exists(DATA_FILENAME):
+        print(f"Loading data from {DATA_FILENAME}")
+        extracted_all_data = pd.read_csv(DATA_FILENAME, index_col=0, parse_dates=True)
+        print("Number of bars in loaded content: " + str(len(extracted_all_data)))
+    else:
+        print(f"Fetching new data for {symbol}")
+        extracted_all_data = get_historical_data(
+            DATA_FILENAME,
+            symbol,
+            START_DATE,
+            END_DATE,
+            TIMEFRAME,
+            chunk_size=1,
+        )
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from src.data.bar_store import DEFAULT_STORE_DIR, BarStore
+from src.strategy.indicators import IndicatorGraph, lookback
+
+DEFAULT_FEATURE_DIR = "src/data/stored_data/features/"
+
+
+def feature_id(node):
+    """Stable file name for an indicator definition, from its structural key."""
+    return hashlib.blake2b(repr(node.key).encode(), digest_size=12).hexdigest()
+
+
+class FeatureStore:
+    """
+    Materialised indicator columns, one .npy per feature per bar partition.
+
+    Features mirror the bar store's yearly partitions row for row. The
+    manifest records, for every feature and partition, the source version
+    it was computed from: the hash of that bar partition plus the hashes of
+    any earlier partitions its lookback reaches into. A feature partition is
+    recomputed only when that version changes, so appending bars to the
+    current year recomputes just the current year.
+    """
+
+    def __init__(self, root=DEFAULT_FEATURE_DIR, bars=None):
+        self.root = root
+        self.bars = bars or BarStore()
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol)
+
+    def _manifest_path(self, symbol):
+        return os.path.join(self._symbol_dir(symbol), "manifest.json")
+
+    def manifest(self, symbol):
+        try:
+            with open(self._manifest_path(symbol)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"features": {}}
+
+    def _write_manifest(self, symbol, manifest):
+        path = self._manifest_path(symbol)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    def _source_versions(self, symbol, bars_needed):
+        """{partition: version} for features needing bars_needed bars of history."""
+        partitions = self.bars.manifest(symbol)["partitions"]
+        labels = sorted(partitions, key=int)
+        versions = {}
+        for i, label in enumerate(labels):
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(f"{label}:{partitions[label]['hash']};".encode())
+            covered, j = 0, i
+            while covered < bars_needed and j > 0:
+                j -= 1
+                digest.update(f"{labels[j]}:{partitions[labels[j]]['hash']};".encode())
+                covered += partitions[labels[j]]["rows"]
+            versions[label] = digest.hexdigest()
+        return versions
+
+    def _context(self, symbol, labels, i, columns, bars_needed):
+        """The last bars_needed rows before partition labels[i], oldest first."""
+        parts, covered, j = [], 0, i
+        while covered < bars_needed and j > 0:
+            j -= 1
+            part = self.bars.read_partition(symbol, labels[j], columns)
+            take = min(bars_needed - covered, len(part[columns[0]]))
+            parts.insert(0, {name: values[len(values) - take :] for name, values in part.items()})
+            covered += take
+        return parts
+
+    def materialize(self, symbol, features):
+        """
+        Bring the stored features up to date with the bar store.
+
+        Parameters:
+        - features: {name: indicator Node}; names are only for the caller,
+          files are keyed by the Node definition.
+
+        Returns:
+        - The number of (feature, partition) arrays computed.
+        """
+        manifest = self.manifest(symbol)
+        labels = self.bars.partitions(symbol)
+        nodes = {feature_id(node): node for node in features.values()}
+        versions = {fid: self._source_versions(symbol, lookback(node)) for fid, node in nodes.items()}
+        for fid, node in nodes.items():
+            manifest["features"].setdefault(fid, {"definition": repr(node), "partitions": {}})
+
+        computed = 0
+        for i, label in enumerate(labels):
+            stale = {
+                fid: node
+                for fid, node in nodes.items()
+                if manifest["features"][fid]["partitions"].get(label) != versions[fid][label]
+            }
+            if not stale:
+                continue
+
+            # One graph per partition so indicators shared by stale features run once
+            graph = IndicatorGraph(stale)
+            columns = graph.columns()
+            bars_needed = max(lookback(node) for node in stale.values())
+            parts = self._context(symbol, labels, i, columns, bars_needed)
+            parts.append(self.bars.read_partition(symbol, label, columns))
+            inputs = {name: np.concatenate([part[name] for part in parts]) for name in columns}
+            rows = len(parts[-1][columns[0]])
+
+            directory = os.path.join(self._symbol_dir(symbol), label)
+            os.makedirs(directory, exist_ok=True)
+            for fid, values in graph.evaluate(inputs).items():
+                path = os.path.join(directory, f"{fid}.npy")
+                with open(f"{path}.tmp", "wb") as f:
+                    np.save(f, values[len(values) - rows :])
+                os.replace(f"{path}.tmp", path)
+                manifest["features"][fid]["partitions"][label] = versions[fid][label]
+                computed += 1
+            # Saved after each partition so an interrupted run keeps its progress
+            self._write_manifest(symbol, manifest)
+        return computed
+
+    def load(self, symbol, features, start=None, end=None, refresh=True):
+        """
+        Stored features with their bar timestamps, optionally limited to [start, end) ns.
+
+        Missing or stale partitions are computed first unless refresh is False.
+
+        Returns:
+        - {'timestamp': array, name: array, ...}
+        """
+        if refresh:
+            self.materialize(symbol, features)
+        timestamps = self.bars.read(symbol, ["timestamp"])["timestamp"]
+        out = {"timestamp": timestamps}
+        for name, node in features.items():
+            fid = feature_id(node)
+            parts = [
+                np.load(os.path.join(self._symbol_dir(symbol), label, f"{fid}.npy"), mmap_mode="r")
+                for label in self.bars.partitions(symbol)
+            ]
+            out[name] = np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+
+        if start is not None or end is not None:
+            lo = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+            hi = len(timestamps) if end is None else np.searchsorted(timestamps, end, side="left")
+            out = {name: values[lo:hi] for name, values in out.items()}
+        return out
+
+    def load_graph(self, symbol, graph, start=None, end=None):
+        """An IndicatorGraph's outputs for a symbol, read from the store."""
+        return self.load(symbol, graph.outputs, start, end)
+
+
+def _materialize_symbol(feature_root, bar_root, symbol, features):
+    return FeatureStore(feature_root, BarStore(bar_root)).materialize(symbol, features)
+
+
+def materialize_many(symbols, features, root=DEFAULT_FEATURE_DIR, bar_root=DEFAULT_STORE_DIR, max_workers=None):
+    """
+    Update the same features for several symbols in parallel, one symbol per
+    task so no two workers write the same manifest.
+
+    Returns:
+    - {symbol: arrays computed}
+    """
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = {
+            symbol: executor.submit(_materialize_symbol, root, bar_root, symbol, features)
+            for symbol in symbols
+        }
+        return {symbol: future.result() for symbol, future in futures.items()}
@@ -0,0 +1,85 @@
+import sys
+import pandas as pd
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from alpaca_trade_api.rest import TimeFrame
+from src.data.bar_store import BAR_DTYPES, BarStore
+from src.data.ingest import SESSION_CLOSE, SESSION_OPEN, load_gap_report, refetch_ranges
+from src.data.parallel_data_getter import alpaca
+
+
+def bars_to_arrays(data):
+    """Alpaca bars DataFrame as bar store columns."""
+    index = pd.DatetimeIndex(data.index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    arrays = {"timestamp": index.asi8}
+    for name in BAR_DTYPES:
+        if name in data:
+            arrays[name] = data[name].to_numpy()
+    return arrays
+
+
+def fetch_range(symbol, start, end, timeframe=TimeFrame.Minute):
+    """
+    All regular-session bars for the New York dates [start, end].
+
+    No limit is passed, so the SDK pages through the whole range rather than
+    stopping at a total bar count, and the session filter runs on New York
+    time rather than UTC.
+    """
+    try:
+        data = alpaca.get_bars(
+            symbol,
+            timeframe,
+            start=pd.Timestamp(start).strftime("%Y-%m-%d"),
+            # The API's end date is exclusive, so ask for the day after
+            end=(pd.Timestamp(end) + timedelta(days=1)).strftime("%Y-%m-%d"),
+            adjustment="all",
+        ).df
+    except Exception as e:
+        print(f"Error fetching data for {start} - {end}: {e}")
+        return pd.DataFrame()
+    if data.empty:
+        return data
+
+    index = pd.DatetimeIndex(data.index)
+    local = (index.tz_localize("UTC") if index.tz is None else index).tz_convert("America/New_York")
+    minute = local.hour * 60 + local.minute
+    return data[(minute >= SESSION_OPEN) & (minute < SESSION_CLOSE)]
+
+
+def fetch_gaps(report, store=None, timeframe=TimeFrame.Minute, min_missing_minutes=30, max_workers=4):
+    """
+    Refetch only the days a gap report flags and merge them into the bar store.
+
+    Returns:
+    - The number of bars that were not already stored.
+    """
+    store = store or BarStore()
+    symbol = report["symbol"]
+    ranges = refetch_ranges(report, min_missing_minutes)
+    print(f"Refetching {len(ranges)} date range(s) for {symbol}")
+
+    added = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_range, symbol, start, end, timeframe): (start, end)
+            for start, end in ranges
+        }
+
+        # Store writes stay on this thread; only the requests run in parallel
+        for future in as_completed(futures):
+            chunk_data = future.result()
+            if chunk_data.empty:
+                print(f"\tNo data returned for {futures[future][0]} to {futures[future][1]}")
+                continue
+            added += len(chunk_data) - store.append(symbol, bars_to_arrays(chunk_data))
+
+    print(f"Added {added} new bars for {symbol}")
+    return added
+
+
+if __name__ == "__main__":
+    store = BarStore()
+    for filename in sys.argv[1:]:
+        fetch_gaps(load_gap_report(filename), store)
@@ -0,0 +1,308 @@
+import json
+import os
+import re
+import sys
+import numpy as np
+import pandas as pd
+from datetime import date
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from src.data.bar_store import BAR_DTYPES, BarStore, partition_of
+
+STORED_DATA_DIR = "src/data/stored_data/"
+
+# data_getter.py and parallel_data_getter.py name their files differently
+FILENAME_PATTERNS = [
+    re.compile(
+        r"(?P<symbol>[A-Z.]+)_all_data_start_date(?P<start>[\d-]+)_end_date(?P<end>[\d-]+)\.csv$"
+    ),
+    re.compile(r"(?P<symbol>[A-Z.]+)_all_data_(?P<start>[\d-]+)_to_(?P<end>[\d-]+)\.csv$"),
+]
+
+# Regular session in minutes after midnight, New York time
+SESSION_OPEN = 9 * 60 + 30
+SESSION_CLOSE = 16 * 60
+SESSION_MINUTES = SESSION_CLOSE - SESSION_OPEN
+
+# Sessions that close at 13:00 New York time
+EARLY_CLOSE_MINUTES = 13 * 60 - SESSION_OPEN
+
+MAX_FLAGGED_EXAMPLES = 20
+
+
+class ExchangeHolidays(AbstractHolidayCalendar):
+    """NYSE full-day holidays (special one-off closures are not included)."""
+
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+def parse_filename(filename):
+    """Symbol, start and end date from either getter's CSV filename."""
+    name = os.path.basename(filename)
+    for pattern in FILENAME_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            return match.group("symbol"), match.group("start"), match.group("end")
+    raise ValueError(f"Unrecognised stored data filename: {name}")
+
+
+def find_archives(directory=STORED_DATA_DIR):
+    """Stored CSV archives from either getter, sorted by filename."""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if any(pattern.search(name) for pattern in FILENAME_PATTERNS)
+    )
+
+
+def exchange_sessions(first_day, last_day):
+    """
+    {date: expected regular-session minutes} from exchange holiday rules.
+
+    The fallback when no MarketCalendar is available: weekdays that are not
+    holidays, with 13:00 early closes on July 3, the day after Thanksgiving
+    and December 24 when those are trading days.
+    """
+    holidays = set(ExchangeHolidays().holidays(first_day, last_day).date)
+    sessions = {}
+    for day in pd.bdate_range(first_day, last_day).date:
+        if day in holidays:
+            continue
+        early = (
+            (day.month, day.day) in ((7, 3), (12, 24))
+            or (day.month == 11 and day.weekday() == 4 and 23 <= day.day <= 29)
+        )
+        sessions[day] = EARLY_CLOSE_MINUTES if early else SESSION_MINUTES
+    return sessions
+
+
+def default_calendar():
+    """A MarketCalendar on the Alpaca API when credentials are set, else None."""
+    if not os.getenv("API_KEY"):
+        return None
+    from alpaca_trade_api.rest import REST
+    from src.data.market_calendar import MarketCalendar
+
+    return MarketCalendar(REST(os.getenv("API_KEY"), os.getenv("API_SECRET"), os.getenv("BASE_URL")))
+
+
+def _examples(timestamps):
+    return [str(pd.Timestamp(ts, tz="UTC")) for ts in timestamps[:MAX_FLAGGED_EXAMPLES]]
+
+
+def ingest_csv(filename, store=None, symbol=None, chunksize=500_000, sessions=None, calendar=None):
+    """
+    Stream a stored CSV into the bar store and validate it in the same pass.
+
+    Rows are read in chunks, cast to the store's fixed dtypes and merged into
+    yearly partitions, so memory is bounded by one partition plus one chunk.
+    Overlapping timestamps (within the file or against what is already
+    stored) are deduplicated; out-of-order and zero-volume rows are flagged.
+
+    Parameters:
+    - sessions: Optional {date: expected regular-session minutes}.
+    - calendar: Optional MarketCalendar to take the sessions from, covering
+      the file's dates. With neither, exchange_sessions() rules are used.
+
+    Returns:
+    - A gap report dict. 'duplicates' counts rows whose timestamp was already
+      in the file or the store; 'missing_sessions' and 'incomplete_sessions'
+      feed refetch_ranges().
+    """
+    store = store or BarStore()
+    if symbol is None:
+        symbol = parse_filename(filename)[0]
+
+    header = pd.read_csv(filename, nrows=0).columns
+    time_column = "timestamp" if "timestamp" in header else header[0]
+    value_columns = [name for name in BAR_DTYPES if name != "timestamp" and name in header]
+    dtypes = {name: BAR_DTYPES[name] for name in value_columns}
+
+    report = {
+        "symbol": symbol,
+        "source": filename,
+        "rows_read": 0,
+        "duplicates": 0,
+        "out_of_order": 0,
+        "zero_volume": 0,
+        "out_of_order_examples": [],
+        "zero_volume_examples": [],
+    }
+    session_minutes = {}
+    pending = {}
+    last_max = np.iinfo(np.int64).min
+    first_ts = last_ts = None
+
+    def flush(labels):
+        for label in labels:
+            parts = pending.pop(label)
+            merged = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+            report["duplicates"] += store.write_partition(symbol, label, merged)
+
+    reader = pd.read_csv(
+        filename,
+        usecols=[time_column, *value_columns],
+        dtype=dtypes,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        times = pd.to_datetime(chunk[time_column], utc=True, format="ISO8601")
+        ts = times.values.view(np.int64)
+        report["rows_read"] += len(ts)
+
+        # Rows earlier than anything already seen are out of order
+        seen_max = np.maximum.accumulate(np.concatenate([[last_max], ts]))[:-1]
+        out_of_order = ts < seen_max
+        report["out_of_order"] += int(out_of_order.sum())
+        report["out_of_order_examples"] += _examples(ts[out_of_order])
+        last_max = max(last_max, int(ts.max()))
+        first_ts = int(ts.min()) if first_ts is None else min(first_ts, int(ts.min()))
+        last_ts = last_max
+
+        if "volume" in chunk:
+            zero_volume = chunk["volume"].to_numpy() == 0
+            report["zero_volume"] += int(zero_volume.sum())
+            report["zero_volume_examples"] += _examples(ts[zero_volume])
+
+        # Count regular-session minutes per New York trading day, skipping
+        # repeats of the previous row so overlaps don't mask gaps
+        local = times.dt.tz_convert("America/New_York")
+        minute = local.dt.hour.to_numpy() * 60 + local.dt.minute.to_numpy()
+        regular = (minute >= SESSION_OPEN) & (minute < SESSION_CLOSE) & (ts != seen_max)
+        days, counts = np.unique(
+            local.dt.date.to_numpy()[regular], return_counts=True
+        )
+        for day, count in zip(days, counts):
+            session_minutes[day] = session_minutes.get(day, 0) + int(count)
+
+        columns = {"timestamp": ts, **{name: chunk[name].to_numpy() for name in value_columns}}
+        labels = partition_of(ts)
+        for label in np.unique(labels):
+            mask = labels == label
+            pending.setdefault(int(label), []).append(
+                {name: values[mask] for name, values in columns.items()}
+            )
+
+        # Sorted input only ever leaves the newest partition open
+        newest = partition_of(np.array([last_max]))[0]
+        flush([label for label in list(pending) if label < newest])
+
+    flush(list(pending))
+
+    report["rows_written"] = report["rows_read"] - report["duplicates"]
+    report["out_of_order_examples"] = report["out_of_order_examples"][:MAX_FLAGGED_EXAMPLES]
+    report["zero_volume_examples"] = report["zero_volume_examples"][:MAX_FLAGGED_EXAMPLES]
+    if first_ts is None:
+        report.update(first=None, last=None, missing_sessions=[], incomplete_sessions={})
+        return report
+
+    report["first"] = str(pd.Timestamp(first_ts, tz="UTC"))
+    report["last"] = str(pd.Timestamp(last_ts, tz="UTC"))
+    report.update(_find_gaps(session_minutes, first_ts, last_ts, sessions, calendar))
+    return report
+
+
+def _find_gaps(session_minutes, first_ts, last_ts, sessions, calendar=None):
+    """Missing sessions and per-session missing minute counts."""
+    first_day = pd.Timestamp(first_ts, tz="UTC").tz_convert("America/New_York").date()
+    last_day = pd.Timestamp(last_ts, tz="UTC").tz_convert("America/New_York").date()
+    if sessions is None and calendar is not None:
+        sessions = calendar.expected_minutes(first_day, last_day)
+    elif sessions is None:
+        sessions = exchange_sessions(first_day, last_day)
+
+    missing_sessions = []
+    incomplete_sessions = {}
+    for day, expected in sorted(sessions.items()):
+        if not first_day <= day <= last_day:
+            continue
+        found = min(session_minutes.get(day, 0), expected)
+        if found == 0:
+            missing_sessions.append(day.isoformat())
+        elif found < expected:
+            incomplete_sessions[day.isoformat()] = expected - found
+    return {"missing_sessions": missing_sessions, "incomplete_sessions": incomplete_sessions}
+
+
+def refetch_ranges(report, min_missing_minutes=30):
+    """
+    Contiguous (start, end) date ranges worth refetching from a gap report.
+
+    A day is included if its session is missing entirely or lacks at least
+    min_missing_minutes regular-session minutes.
+    """
+    days = set(report["missing_sessions"])
+    days.update(
+        day
+        for day, missing in report["incomplete_sessions"].items()
+        if missing >= min_missing_minutes
+    )
+
+    ranges = []
+    for day in sorted(date.fromisoformat(d) for d in days):
+        if ranges and (day - ranges[-1][1]).days <= 3:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [(start, end) for start, end in ranges]
+
+
+def gap_report_path(source):
+    """Gap report filename for a source CSV, saved alongside it."""
+    return f"{os.path.splitext(source)[0]}_gap_report.json"
+
+
+def write_gap_report(report, filename=None):
+    """Save a gap report as JSON next to its source CSV."""
+    filename = filename or gap_report_path(report["source"])
+    with open(filename, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved gap report to {filename}")
+    return filename
+
+
+def load_gap_report(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def print_report(report):
+    print(f"\n{'*' * 50}")
+    print(f"{report['symbol']}: {report['source']}")
+    print(f"\tRows read: {report['rows_read']}, written: {report['rows_written']}")
+    print(f"\tDuplicate timestamps dropped: {report['duplicates']}")
+    print(f"\tOut-of-order rows: {report['out_of_order']}")
+    print(f"\tZero-volume rows: {report['zero_volume']}")
+    print(f"\tMissing sessions: {len(report['missing_sessions'])}")
+    print(f"\tIncomplete sessions: {len(report['incomplete_sessions'])}")
+
+
+if __name__ == "__main__":
+    store = BarStore()
+    calendar = default_calendar()
+    for filename in sys.argv[1:] or find_archives():
+        report = ingest_csv(filename, store, calendar=calendar)
+        print_report(report)
+        write_gap_report(report)
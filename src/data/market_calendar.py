@@ -0,0 +1,118 @@
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+CALENDAR_FILENAME = "src/data/stored_data/calendar.json"
+NEW_YORK = ZoneInfo("America/New_York")
+REGULAR_CLOSE = time(16, 0)
+
+
+class MarketCalendar:
+    """
+    Trading sessions from Alpaca's calendar endpoint, cached in a local file.
+
+    The calendar is only re-fetched when a lookup falls outside the covered
+    date range, so checking whether the market is open costs no API call.
+    Dates inside the covered range with no session are holidays; early
+    closes show up as sessions closing before 16:00.
+    """
+
+    def __init__(self, api, filename=CALENDAR_FILENAME, days_ahead=60):
+        self.api = api
+        self.filename = filename
+        self.days_ahead = days_ahead
+        self.start = None
+        self.end = None
+        self.sessions = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename) as f:
+            cached = json.load(f)
+        self.start = date.fromisoformat(cached["start"])
+        self.end = date.fromisoformat(cached["end"])
+        self.sessions = {
+            date.fromisoformat(day): (time.fromisoformat(open_), time.fromisoformat(close))
+            for day, (open_, close) in cached["sessions"].items()
+        }
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        with open(self.filename, "w") as f:
+            json.dump(
+                {
+                    "start": self.start.isoformat(),
+                    "end": self.end.isoformat(),
+                    "sessions": {
+                        day.isoformat(): [open_.strftime("%H:%M"), close.strftime("%H:%M")]
+                        for day, (open_, close) in sorted(self.sessions.items())
+                    },
+                },
+                f,
+                indent=2,
+            )
+
+    def refresh(self, start, end):
+        """Fetch sessions for [start, end] and merge them into the cache."""
+        print(f"Fetching market calendar from {start} to {end}")
+        for day in self.api.get_calendar(start.isoformat(), end.isoformat()):
+            self.sessions[day.date.date()] = (day.open, day.close)
+
+        # Extend the covered range when contiguous, otherwise start a new one
+        if self.start is None or start > self.end + timedelta(days=1) or end < self.start - timedelta(days=1):
+            self.start, self.end = start, end
+        else:
+            self.start, self.end = min(self.start, start), max(self.end, end)
+        self._save()
+
+    def _ensure(self, day, days=7):
+        if self.start is None or day < self.start or day + timedelta(days=days) > self.end:
+            self.refresh(day, day + timedelta(days=self.days_ahead))
+
+    def session(self, day):
+        """(open, close) aware datetimes for a date, or None if the market is closed."""
+        self._ensure(day)
+        hours = self.sessions.get(day)
+        if hours is None:
+            return None
+        open_, close = hours
+        return (
+            datetime.combine(day, open_, tzinfo=NEW_YORK),
+            datetime.combine(day, close, tzinfo=NEW_YORK),
+        )
+
+    def is_open(self, now):
+        """Whether now (an aware datetime) falls inside a regular session."""
+        hours = self.session(now.astimezone(NEW_YORK).date())
+        return hours is not None and hours[0] <= now < hours[1]
+
+    def next_session(self, now):
+        """The current session if still open at now, else the next one."""
+        day = now.astimezone(NEW_YORK).date()
+        for offset in range(self.days_ahead):
+            hours = self.session(day + timedelta(days=offset))
+            if hours is not None and now < hours[1]:
+                return hours
+        raise RuntimeError(f"No trading session within {self.days_ahead} days of {now}")
+
+    def early_closes(self):
+        """Cached dates whose session closes before the regular 16:00."""
+        return sorted(day for day, (_, close) in self.sessions.items() if close < REGULAR_CLOSE)
+
+    def expected_minutes(self, start=None, end=None):
+        """
+        {date: regular-session minutes}, e.g. for ingest_csv. With both start
+        and end given, the range is fetched first if the cache doesn't cover it.
+        """
+        if start is not None and end is not None and (
+            self.start is None or start < self.start or end > self.end
+        ):
+            self.refresh(start, end)
+        return {
+            day: (close.hour * 60 + close.minute) - (open_.hour * 60 + open_.minute)
+            for day, (open_, close) in self.sessions.items()
+            if (start is None or day >= start) and (end is None or day <= end)
+        }
@@ -97,18 +97,19 @@ TIMEFRAME = TimeFrame.Minute
 DIRECTORY_PREFIX = "src/data/stored_data/"
 DATA_FILENAME = f"{DIRECTORY_PREFIX}{symbol}_all_data_{START_DATE}_to_{END_DATE}.csv"
 
-if os.path.exists(DATA_FILENAME):
-    print(f"Loading data from {DATA_FILENAME}")
-    extracted_all_data = pd.read_csv(DATA_FILENAME, index_col=0, parse_dates=True)
-    print(f"Number of bars in loaded content: {len(extracted_all_data)}")
-else:
-    print(f"Fetching new data for {symbol}")
-    extracted_all_data = get_historical_data_parallel(
-        DATA_FILENAME,
-        symbol,
-        START_DATE,
-        END_DATE,
-        TIMEFRAME,
-        chunk_size=1,
-        max_workers=6
-    )
+if __name__ == "__main__":
+    if os.path.exists(DATA_FILENAME):
+        print(f"Loading data from {DATA_FILENAME}")
+        extracted_all_data = pd.read_csv(DATA_FILENAME, index_col=0, parse_dates=True)
+        print(f"Number of bars in loaded content: {len(extracted_all_data)}")
+    else:
+        print(f"Fetching new data for {symbol}")
+        extracted_all_data = get_historical_data_parallel(
+            DATA_FILENAME,
+            symbol,
+            START_DATE,
+            END_DATE,
+            TIMEFRAME,
+            chunk_size=1,
+            max_workers=6
+        )
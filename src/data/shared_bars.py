@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from src.data.bar_store import BAR_DTYPES, BarStore
+
+# Segments this process has attached to, kept alive while views exist
+_ATTACHED = {}
+
+
+class SharedBarStore:
+    """
+    Owns shared-memory copies of bar columns, one block per column.
+
+    Each symbol is published once and reference counted: every load/publish of
+    an already-shared symbol bumps the count, every release drops it, and the
+    blocks are unlinked when it reaches zero. Workers only receive the small,
+    picklable handle and map the columns with attach().
+    """
+
+    def __init__(self):
+        self._blocks = {}
+        self._handles = {}
+        self._refcounts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def publish(self, symbol, columns):
+        """Copy a dict of 1-D arrays into shared memory and return its handle."""
+        if symbol in self._handles:
+            self._refcounts[symbol] += 1
+            return self._handles[symbol]
+
+        blocks = []
+        handle = {"symbol": symbol, "columns": {}}
+        try:
+            for name, values in columns.items():
+                values = np.ascontiguousarray(values)
+                shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks.append(shm)
+                view = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+                view[:] = values
+                handle["columns"][name] = (shm.name, values.dtype.str, len(values))
+        except Exception:
+            _unlink(blocks)
+            raise
+
+        self._blocks[symbol] = blocks
+        self._handles[symbol] = handle
+        self._refcounts[symbol] = 1
+        return handle
+
+    def load_csv(self, symbol, filename, columns=("timestamp", "close")):
+        """Read the requested bar columns of a stored CSV straight into shared memory."""
+        if symbol in self._handles:
+            return self.publish(symbol, None)
+
+        dtypes = {name: BAR_DTYPES[name] for name in columns if name != "timestamp"}
+        df = pd.read_csv(filename, usecols=list(columns), dtype=dtypes)
+        arrays = {}
+        for name in columns:
+            if name == "timestamp":
+                arrays[name] = pd.to_datetime(df[name], utc=True).values.view("int64")
+            else:
+                arrays[name] = df[name].to_numpy()
+        del df
+        return self.publish(symbol, arrays)
+
+    def load_store(self, symbol, store=None, columns=("timestamp", "close"), start=None, end=None):
+        """Copy a symbol's columns from the binary bar store into shared memory."""
+        if symbol in self._handles:
+            return self.publish(symbol, None)
+        store = store or BarStore()
+        return self.publish(symbol, store.read(symbol, columns, start, end))
+
+    def release(self, symbol):
+        """Drop one reference to a symbol, unlinking its blocks on the last one."""
+        self._refcounts[symbol] -= 1
+        if self._refcounts[symbol] == 0:
+            _unlink(self._blocks.pop(symbol))
+            del self._handles[symbol]
+            del self._refcounts[symbol]
+
+    def close(self):
+        """Unlink every block regardless of outstanding references."""
+        for blocks in self._blocks.values():
+            _unlink(blocks)
+        self._blocks.clear()
+        self._handles.clear()
+        self._refcounts.clear()
+
+
+def _unlink(blocks):
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+def attach(handle):
+    """Map a published symbol's columns as read-only, zero-copy NumPy arrays."""
+    arrays = {}
+    for name, (shm_name, dtype, length) in handle["columns"].items():
+        shm = _ATTACHED.get(shm_name)
+        if shm is None:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            _ATTACHED[shm_name] = shm
+        view = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf)
+        view.flags.writeable = False
+        arrays[name] = view
+    return arrays
+
+
+def detach(handle):
+    """Close this process's mappings of a handle; views must no longer be used."""
+    for shm_name, _, _ in handle["columns"].values():
+        shm = _ATTACHED.pop(shm_name, None)
+        if shm is not None:
+            shm.close()
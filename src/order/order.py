@@ -13,7 +13,14 @@ load_dotenv()
 API_KEY = os.getenv('API_KEY')
 API_SECRET = os.getenv('API_SECRET')
 
-trading_client = TradingClient(API_KEY, API_SECRET, paper=True)
+# Created on first use, so importing the helpers needs no credentials
+trading_client = None
+
+def get_trading_client():
+    global trading_client
+    if trading_client is None:
+        trading_client = TradingClient(API_KEY, API_SECRET, paper=True)
+    return trading_client
 
 def marketbuy(symbol, qty, TIF=TimeInForce.GTC):
     
@@ -23,9 +30,10 @@ def marketbuy(symbol, qty, TIF=TimeInForce.GTC):
                     side=OrderSide.BUY,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
     
 def marketsell(symbol, qty, TIF=TimeInForce.GTC):
     market_order_data = MarketOrderRequest(
@@ -34,9 +42,10 @@ def marketsell(symbol, qty, TIF=TimeInForce.GTC):
                     side=OrderSide.SELL,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
     
 def limitbuy(symbol, qty, limitprice, TIF=TimeInForce.GTC):
     market_order_data = LimitOrderRequest(
@@ -46,9 +55,10 @@ def limitbuy(symbol, qty, limitprice, TIF=TimeInForce.GTC):
                     side=OrderSide.BUY,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
     
 def limitsell(symbol, qty, limitprice, TIF=TimeInForce.GTC):
     market_order_data = LimitOrderRequest(
@@ -58,9 +68,10 @@ def limitsell(symbol, qty, limitprice, TIF=TimeInForce.GTC):
                     side=OrderSide.SELL,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
 
 def stoplimitbuy(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
     market_order_data = StopLimitOrderRequest(
@@ -71,9 +82,10 @@ def stoplimitbuy(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
                     side=OrderSide.BUY,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
     
 def stoplimitsell(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
     market_order_data = StopLimitOrderRequest(
@@ -84,9 +96,10 @@ def stoplimitsell(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
                     side=OrderSide.SELL,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
 
 def stopbuy(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
     market_order_data = StopLimitOrderRequest(
@@ -97,9 +110,10 @@ def stopbuy(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
                     side=OrderSide.BUY,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
     
 def stopsell(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
     market_order_data = StopLimitOrderRequest(
@@ -110,7 +124,8 @@ def stopsell(symbol, qty, limitprice, stopprice, TIF=TimeInForce.GTC):
                     side=OrderSide.SELL,
                     time_in_force= TIF
                     )
-    market_order = trading_client.submit_order(
+    market_order = get_trading_client().submit_order(
                 order_data=market_order_data
                )
+    return market_order
     
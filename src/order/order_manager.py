@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+import uuid
+import numpy as np
+from alpaca.trading.client import TradingClient
+from alpaca.trading.stream import TradingStream
+from alpaca.trading.requests import MarketOrderRequest
+from alpaca.trading.enums import OrderSide, TimeInForce
+
+# Trade update events after which an order can no longer change
+FINAL_EVENTS = {"fill", "canceled", "rejected", "expired"}
+
+
+class TrackedOrder:
+    """An order submitted through the OrderManager, updated from trade events."""
+
+    def __init__(self, client_order_id, symbol, side, qty, done, notional=None):
+        self.client_order_id = client_order_id
+        self.order_id = None
+        self.symbol = symbol
+        self.side = side
+        self.qty = qty
+        self.notional = notional
+        self.status = "pending_new"
+        self.filled_qty = 0.0
+        self.filled_avg_price = None
+        self.submitted_at = time.monotonic()
+        self.acked_at = None
+        self.filled_at = None
+        self.done = done
+
+    def latencies(self):
+        """Seconds from submit to ack, ack to fill and submit to fill, where known."""
+        out = {}
+        if self.acked_at is not None:
+            out["submit_to_ack"] = self.acked_at - self.submitted_at
+        if self.filled_at is not None:
+            out["submit_to_fill"] = self.filled_at - self.submitted_at
+            if self.acked_at is not None:
+                out["ack_to_fill"] = self.filled_at - self.acked_at
+        return out
+
+
+class OrderManager:
+    """
+    Order and position book kept current by the trade-updates WebSocket.
+
+    Positions, cash and buying power are read once over REST at start();
+    after that every fill event updates the book, so strategy code can check
+    its own state without any API call. Each submitted order gets a Future that completes on its final
+    event, and submit->ack->fill latencies are recorded for completed orders.
+
+    The stream runs on its own thread; events are handed to the manager's
+    event loop, which owns all book updates.
+    """
+
+    def __init__(self, api_key, api_secret, paper=True, trading_client=None, stream=None):
+        self.client = trading_client or TradingClient(api_key, api_secret, paper=paper)
+        self.stream = stream or TradingStream(api_key, api_secret, paper=paper)
+        self.orders = {}
+        self.positions = {}
+        self.cash = None
+        self.buying_power = None
+        self.completed_latencies = []
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        """Seed the position book and start consuming trade updates."""
+        self._loop = asyncio.get_running_loop()
+        positions, account = await asyncio.gather(
+            asyncio.to_thread(self.client.get_all_positions),
+            asyncio.to_thread(self.client.get_account),
+        )
+        self.positions = {p.symbol: float(p.qty) for p in positions}
+        self.cash = float(account.cash)
+        self.buying_power = float(account.buying_power)
+
+        self.stream.subscribe_trade_updates(self._on_trade_update)
+        self._thread = threading.Thread(target=self.stream.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.stream.stop()
+
+    async def _on_trade_update(self, update):
+        # Runs on the stream's thread; book updates happen on our loop
+        self._loop.call_soon_threadsafe(self._apply, update, time.monotonic())
+
+    def _apply(self, update, received_at):
+        order = update.order
+        event = getattr(update.event, "value", update.event)
+
+        if event in ("fill", "partial_fill"):
+            if update.qty is not None and update.price is not None:
+                # Each fill event carries that execution's own qty and price
+                side = getattr(order.side, "value", order.side)
+                notional = float(update.qty) * float(update.price)
+                change = -notional if side == "buy" else notional
+                self.cash += change
+                self.buying_power += change
+            if update.position_qty is not None:
+                self.positions[order.symbol] = float(update.position_qty)
+            elif update.qty is not None:
+                side = getattr(order.side, "value", order.side)
+                signed = float(update.qty) if side == "buy" else -float(update.qty)
+                self.positions[order.symbol] = self.positions.get(order.symbol, 0.0) + signed
+
+        tracked = self.orders.get(order.client_order_id)
+        if tracked is None:
+            return  # Placed outside this manager; only the position matters
+
+        tracked.order_id = order.id
+        tracked.status = event
+        if tracked.acked_at is None and event != "pending_new":
+            tracked.acked_at = received_at
+        if order.filled_qty is not None:
+            tracked.filled_qty = float(order.filled_qty)
+        if order.filled_avg_price is not None:
+            tracked.filled_avg_price = float(order.filled_avg_price)
+        if event == "fill":
+            tracked.filled_at = received_at
+
+        if event in FINAL_EVENTS and not tracked.done.done():
+            self.completed_latencies.append(tracked.latencies())
+            tracked.done.set_result(tracked)
+
+    async def submit(self, order_data):
+        """
+        Submit an alpaca-py order request and track it.
+
+        Returns:
+        - The TrackedOrder; await manager.wait(order) for its final state.
+        """
+        # A client-side id lets events be matched even if they beat the REST reply
+        order_data.client_order_id = order_data.client_order_id or str(uuid.uuid4())
+        side = getattr(order_data.side, "value", order_data.side)
+        # Notional orders have no qty until they fill
+        qty = getattr(order_data, "qty", None)
+        notional = getattr(order_data, "notional", None)
+        tracked = TrackedOrder(
+            order_data.client_order_id,
+            order_data.symbol,
+            side,
+            None if qty is None else float(qty),
+            self._loop.create_future(),
+            None if notional is None else float(notional),
+        )
+        self.orders[tracked.client_order_id] = tracked
+
+        try:
+            order = await asyncio.to_thread(self.client.submit_order, order_data=order_data)
+        except Exception:
+            del self.orders[tracked.client_order_id]
+            tracked.done.cancel()
+            raise
+        tracked.order_id = order.id
+        return tracked
+
+    def submit_threadsafe(self, order_data):
+        """submit() for code running outside the manager's loop, e.g. in asyncio.to_thread."""
+        return asyncio.run_coroutine_threadsafe(self.submit(order_data), self._loop).result()
+
+    async def market_order(self, symbol, qty, side, time_in_force=TimeInForce.DAY):
+        return await self.submit(
+            MarketOrderRequest(
+                symbol=symbol,
+                qty=qty,
+                side=OrderSide(side),
+                time_in_force=time_in_force,
+            )
+        )
+
+    async def wait(self, tracked, timeout=None):
+        """Wait for an order's final event and return it."""
+        return await asyncio.wait_for(asyncio.shield(tracked.done), timeout)
+
+    def position(self, symbol):
+        """Current quantity held in a symbol, from the local book."""
+        return self.positions.get(symbol, 0.0)
+
+    def available_buying_power(self):
+        """
+        Buying power from the local book: the account value read at start(),
+        moved by every fill since. Margin changes from price moves between
+        fills are not reflected until the next start().
+        """
+        return self.buying_power
+
+    def open_orders(self):
+        return [o for o in self.orders.values() if not o.done.done()]
+
+    def latency_summary(self):
+        """Median and 95th percentile of each latency leg, in seconds."""
+        summary = {}
+        for leg in ("submit_to_ack", "ack_to_fill", "submit_to_fill"):
+            values = [l[leg] for l in self.completed_latencies if leg in l]
+            if values:
+                summary[leg] = {
+                    "median": float(np.median(values)),
+                    "p95": float(np.percentile(values, 95)),
+                    "count": len(values),
+                }
+        return summary
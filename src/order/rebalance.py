@@ -0,0 +1,140 @@
+import asyncio
+from collections import namedtuple
+import numpy as np
+
+PlannedOrder = namedtuple("PlannedOrder", ["symbol", "side", "qty", "price"])
+
+
+def _lookup(values, symbols, default):
+    """Per-symbol array from a scalar or a {symbol: value} dict."""
+    if isinstance(values, dict):
+        return np.array([values.get(s, default) for s in symbols], dtype=np.float64)
+    return np.full(len(symbols), values, dtype=np.float64)
+
+
+def plan_rebalance(
+    targets, holdings, prices, buying_power, lot_size=1, use_sale_proceeds=True
+):
+    """
+    Net target positions from every strategy against current holdings.
+
+    Targets for the same symbol are summed before netting, so offsetting
+    decisions cancel instead of producing a buy and a sell. Only symbols some
+    strategy targets are traded; other holdings are left alone (target 0 to
+    close one). Each net change is rounded toward zero to whole lots. A change
+    that crosses zero (long to short or back) becomes a closing order plus an
+    opening order, since the broker rejects selling more than is held. New
+    long buys are scaled down together (then rounded down again) if all buys
+    would exceed the buying power.
+
+    Parameters:
+    - targets: {strategy: {symbol: target qty}}; negative quantities are shorts.
+    - holdings: {symbol: current qty}.
+    - prices: {symbol: latest price} for every symbol that needs an order.
+    - lot_size: Order size multiple, either one value or {symbol: lot}.
+    - use_sale_proceeds: Count the proceeds of selling longs toward the buying
+      power. Short-sale proceeds never count.
+
+    Returns:
+    - PlannedOrder tuples, sells before buys.
+    """
+    symbols = sorted(set().union(*targets.values()))
+    if not symbols:
+        return []
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    target = np.zeros(len(symbols))
+    for strategy_targets in targets.values():
+        idx = np.fromiter((index[s] for s in strategy_targets), dtype=np.int64)
+        qty = np.fromiter(strategy_targets.values(), dtype=np.float64)
+        np.add.at(target, idx, qty)
+
+    current = _lookup(holdings, symbols, 0.0)
+    price = _lookup(prices, symbols, np.nan)
+    lot = _lookup(lot_size, symbols, 1)
+
+    delta = np.trunc((target - current) / lot) * lot
+    missing = (delta != 0) & np.isnan(price)
+    if missing.any():
+        raise ValueError(f"No price for {[symbols[i] for i in np.flatnonzero(missing)]}")
+
+    # Split each change into the part that closes the current position and
+    # the part that opens a new one on the other side (or adds to it)
+    closing = np.where(
+        np.sign(delta) == -np.sign(current),
+        np.sign(delta) * np.minimum(np.abs(delta), np.abs(current)),
+        0.0,
+    )
+    opening = delta - closing
+
+    available = buying_power
+    if use_sale_proceeds:
+        sold_longs = closing < 0
+        available += float((-closing[sold_longs] * price[sold_longs]).sum())
+    covers = float((closing[closing > 0] * price[closing > 0]).sum())
+    buys = opening > 0
+    cost = covers + float((opening[buys] * price[buys]).sum())
+    # Covers are never scaled (they only reduce risk), so with no new long
+    # buys there is nothing to shrink
+    if cost > available and buys.any():
+        scale = max(available - covers, 0.0) / (cost - covers)
+        opening[buys] = np.floor(opening[buys] * scale / lot[buys]) * lot[buys]
+
+    legs = [
+        (closing, closing < 0, "sell"),
+        (opening, opening < 0, "sell"),
+        (closing, closing > 0, "buy"),
+        (opening, opening > 0, "buy"),
+    ]
+    return [
+        PlannedOrder(symbols[i], side, float(abs(qty[i])), float(price[i]))
+        for qty, mask, side in legs
+        for i in np.flatnonzero(mask)
+    ]
+
+
+def execute_plan(orders):
+    """Submit planned orders as market orders through the order.py helpers."""
+    from src.order import order
+
+    submitted = []
+    for planned in orders:
+        submit = order.marketsell if planned.side == "sell" else order.marketbuy
+        print(f"{planned.side.upper()}: {planned.qty:g} share(s) of {planned.symbol}")
+        submitted.append(submit(planned.symbol, planned.qty))
+    return submitted
+
+
+def _waves(orders):
+    """
+    Consecutive batches of planned orders that can be in flight together:
+    one side at a time, and a symbol's closing leg before its opening leg.
+    """
+    waves = []
+    for planned in orders:
+        wave = waves[-1] if waves else None
+        if (
+            wave is None
+            or wave[0].side != planned.side
+            or planned.symbol in {o.symbol for o in wave}
+        ):
+            waves.append([planned])
+        else:
+            wave.append(planned)
+    return waves
+
+
+async def execute_plan_async(orders, order_manager):
+    """
+    Submit planned orders through an OrderManager, a wave at a time: all
+    closing sells at once, then opening sells, then buys, waiting for each
+    wave to finish so sale proceeds are available and a position is closed
+    before the other side is opened.
+    """
+    done = []
+    for batch in _waves(orders):
+        tracked = await asyncio.gather(
+            *(order_manager.market_order(o.symbol, o.qty, o.side) for o in batch)
+        )
+        done += await asyncio.gather(*(order_manager.wait(t) for t in tracked))
+    return done
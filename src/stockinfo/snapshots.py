@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from alpaca_trade_api.rest import REST
+
+load_dotenv()
+
+API_KEY = os.getenv('API_KEY')
+API_SECRET = os.getenv('API_SECRET')
+BASE_URL = os.getenv('BASE_URL')
+
+# Seconds a snapshot may be served from memory before it is refetched
+DEFAULT_MAX_AGE = 5.0
+
+
+class Snapshot:
+    """Latest trade, quote and minute bar for one symbol."""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.trade = None
+        self.quote = None
+        self.bar = None
+        self.updated_at = None
+
+    @property
+    def price(self):
+        if self.trade is not None:
+            return self.trade.price
+        return self.bar.close if self.bar is not None else None
+
+    def age(self):
+        if self.updated_at is None:
+            return float("inf")
+        return time.monotonic() - self.updated_at
+
+
+class SnapshotService:
+    """
+    In-memory latest trade, quote and bar for a watched set of symbols.
+
+    Reads are served from memory while the snapshot is younger than max_age.
+    Otherwise every stale watched symbol is refetched together in a single
+    multi-symbol snapshots request. An attached data stream keeps the
+    snapshots fresh, so reads rarely reach the REST fallback.
+    """
+
+    def __init__(self, api=None, symbols=("SPY",), max_age=DEFAULT_MAX_AGE, feed=None):
+        self.api = api or REST(API_KEY, API_SECRET, BASE_URL)
+        self.max_age = max_age
+        self.feed = feed
+        self.snapshots = {}
+        self._lock = threading.Lock()
+        self._stream = None
+        self._thread = None
+        self.watch(*symbols)
+
+    def watch(self, *symbols):
+        """Add symbols to the set refreshed together."""
+        with self._lock:
+            new = [s for s in symbols if s not in self.snapshots]
+            for symbol in new:
+                self.snapshots[symbol] = Snapshot(symbol)
+        if self._stream is not None and new:
+            self._subscribe(new)
+
+    def refresh(self, symbols=None):
+        """Fetch snapshots for symbols (default: all watched) in one request."""
+        symbols = list(symbols or self.snapshots)
+        response = self.api.get_snapshots(symbols, feed=self.feed)
+        now = time.monotonic()
+        with self._lock:
+            for symbol, raw in response.items():
+                if raw is None:
+                    continue
+                snapshot = self.snapshots.setdefault(symbol, Snapshot(symbol))
+                snapshot.trade = raw.latest_trade
+                snapshot.quote = raw.latest_quote
+                snapshot.bar = raw.minute_bar
+                snapshot.updated_at = now
+
+    def get(self, symbol, max_age=None):
+        """
+        Snapshot for symbol no older than max_age seconds.
+
+        A stale read refetches every stale watched symbol along with it, so
+        the next reads of the others are served from memory.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        self.watch(symbol)
+        if self.snapshots[symbol].age() > max_age:
+            with self._lock:
+                stale = [s for s, snap in self.snapshots.items() if snap.age() > max_age]
+            self.refresh(stale)
+        return self.snapshots[symbol]
+
+    def latest_trade(self, symbol, max_age=None):
+        return self.get(symbol, max_age).trade
+
+    def latest_price(self, symbol, max_age=None):
+        return self.get(symbol, max_age).price
+
+    def prices(self, symbols, max_age=None):
+        """{symbol: latest price}, fetching any stale ones in one request."""
+        self.watch(*symbols)
+        max_age = self.max_age if max_age is None else max_age
+        stale = [s for s in symbols if self.snapshots[s].age() > max_age]
+        if stale:
+            self.refresh(stale)
+        return {s: self.snapshots[s].price for s in symbols}
+
+    def attach_stream(self, stream):
+        """
+        Keep snapshots current from an alpaca_trade_api Stream.
+
+        The stream runs on its own thread; its handlers only replace the
+        in-memory trade, quote or bar under the lock.
+        """
+        self._stream = stream
+        self._subscribe(list(self.snapshots))
+        self._thread = threading.Thread(target=stream.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream = None
+
+    def _subscribe(self, symbols):
+        self._stream.subscribe_trades(self._on_trade, *symbols)
+        self._stream.subscribe_quotes(self._on_quote, *symbols)
+        self._stream.subscribe_bars(self._on_bar, *symbols)
+
+    def _update(self, symbol, field, value):
+        with self._lock:
+            snapshot = self.snapshots.setdefault(symbol, Snapshot(symbol))
+            setattr(snapshot, field, value)
+            snapshot.updated_at = time.monotonic()
+
+    async def _on_trade(self, trade):
+        self._update(trade.symbol, "trade", trade)
+
+    async def _on_quote(self, quote):
+        self._update(quote.symbol, "quote", quote)
+
+    async def _on_bar(self, bar):
+        self._update(bar.symbol, "bar", bar)
+
+
+_default = None
+
+
+def default_service():
+    """The process-wide SnapshotService shared by spy, the bots and the CLI."""
+    global _default
+    if _default is None:
+        _default = SnapshotService()
+    return _default
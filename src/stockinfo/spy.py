@@ -1,17 +1,6 @@
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-API_KEY = os.getenv('API_KEY')
-API_SECRET = os.getenv('API_SECRET')
-BASE_URL = os.getenv('BASE_URL')
-
-from alpaca_trade_api.rest import REST
-
-alpaca = REST(API_KEY, API_SECRET, BASE_URL)
+from src.stockinfo.snapshots import default_service
 
 # Get latest price for SPY
 def getSPY():
-    barset = alpaca.get_latest_bar("SPY")
-    print(barset)
+    snapshot = default_service().get("SPY")
+    print(snapshot.bar)
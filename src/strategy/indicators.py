@@ -0,0 +1,264 @@
+import math
+from collections import deque
+import numpy as np
+
+
+class Node:
+    """
+    One indicator expression. Nodes are identified by a structural key, so the
+    same expression declared twice (e.g. the shifted SMAs used by both
+    crossover rules) is evaluated once.
+    """
+
+    def __init__(self, op, params=(), args=()):
+        self.op = op
+        self.params = tuple(params)
+        self.args = tuple(args)
+        self.key = (op, self.params, tuple(arg.key for arg in self.args))
+
+    def __gt__(self, other):
+        return Node("gt", args=(self, _node(other)))
+
+    def __lt__(self, other):
+        return Node("lt", args=(self, _node(other)))
+
+    def __ge__(self, other):
+        return Node("ge", args=(self, _node(other)))
+
+    def __le__(self, other):
+        return Node("le", args=(self, _node(other)))
+
+    def __and__(self, other):
+        return Node("and", args=(self, _node(other)))
+
+    def __or__(self, other):
+        return Node("or", args=(self, _node(other)))
+
+    def __invert__(self):
+        return Node("not", args=(self,))
+
+    def __repr__(self):
+        if self.op in ("col", "const"):
+            return str(self.params[0])
+        args = ", ".join(map(repr, self.args + self.params))
+        return f"{self.op}({args})"
+
+
+def col(name):
+    """An input column, e.g. col('close')."""
+    return Node("col", (name,))
+
+
+def const(value):
+    """A constant, e.g. for pct_change(col('close')) > 0."""
+    return Node("const", (float(value),))
+
+
+def _node(value):
+    return value if isinstance(value, Node) else const(value)
+
+
+def sma(source, window):
+    """Trailing simple moving average, NaN until the window fills."""
+    return Node("sma", (window,), (source,))
+
+
+def shift(source, periods=1):
+    """The value periods bars ago, NaN before that."""
+    return Node("shift", (periods,), (source,))
+
+
+def pct_change(source, periods=1):
+    """Fractional change from periods bars ago, NaN before that."""
+    return Node("pct_change", (periods,), (source,))
+
+
+def lookback(node):
+    """Bars of history before a bar that its value depends on."""
+    inner = max((lookback(arg) for arg in node.args), default=0)
+    if node.op == "sma":
+        return inner + node.params[0] - 1
+    if node.op in ("shift", "pct_change"):
+        return inner + node.params[0]
+    return inner
+
+
+def cross_above(a, b):
+    """a crosses from at-or-below b to above it on this bar."""
+    return (a > b) & (shift(a) <= shift(b))
+
+
+def cross_below(a, b):
+    """a crosses from at-or-above b to below it on this bar."""
+    return (a < b) & (shift(a) >= shift(b))
+
+
+def signal(buy, sell):
+    """1 on buy bars, -1 on sell bars (sell wins), 0 otherwise."""
+    return Node("signal", args=(buy, sell))
+
+
+def _rolling_mean(values, window):
+    # Accumulate in float64 so long minute series don't drift. NaNs (e.g. the
+    # warm-up of an inner indicator) are summed as zero and counted, so only
+    # windows that contain one come out NaN
+    missing = np.isnan(values)
+    csum = np.cumsum(np.where(missing, 0.0, values), axis=-1, dtype=np.float64)
+    nans = np.cumsum(missing, axis=-1)
+    out = np.full(values.shape, np.nan, dtype=np.float32)
+    if values.shape[-1] < window:
+        return out
+    total = csum[..., window - 1 :].copy()
+    total[..., 1:] -= csum[..., :-window]
+    count = nans[..., window - 1 :].copy()
+    count[..., 1:] -= nans[..., :-window]
+    out[..., window - 1 :] = np.where(count == 0, total / window, np.nan)
+    return out
+
+
+def _shift(values, periods):
+    out = np.full(values.shape, np.nan, dtype=np.float32)
+    out[..., periods:] = values[..., :-periods]
+    return out
+
+
+# Batch implementations; every op works along the last axis so a 2-D
+# (paths, bars) input evaluates all paths at once
+_BATCH = {
+    "const": lambda params: np.float32(params[0]),
+    "sma": lambda params, x: _rolling_mean(x, params[0]),
+    "shift": lambda params, x: _shift(x, params[0]),
+    "pct_change": lambda params, x: x / _shift(x, params[0]) - 1,
+    "gt": lambda params, a, b: a > b,
+    "lt": lambda params, a, b: a < b,
+    "ge": lambda params, a, b: a >= b,
+    "le": lambda params, a, b: a <= b,
+    "and": lambda params, a, b: a & b,
+    "or": lambda params, a, b: a | b,
+    "not": lambda params, a: ~a,
+    "signal": lambda params, buy, sell: np.where(sell, -1, np.where(buy, 1, 0)).astype(np.int8),
+}
+
+
+class IndicatorGraph:
+    """
+    A set of named indicator outputs compiled into a deduplicated DAG.
+
+    evaluate() computes every node once, in topological order, over whole
+    float32 arrays for backtests. streaming() returns an evaluator that
+    updates the same outputs one bar at a time for live trading.
+    """
+
+    def __init__(self, outputs):
+        self.outputs = dict(outputs)
+        self.order = []
+        seen = set()
+
+        def visit(node):
+            if node.key in seen:
+                return
+            seen.add(node.key)
+            for arg in node.args:
+                visit(arg)
+            self.order.append(node)
+
+        for node in self.outputs.values():
+            visit(node)
+
+    def columns(self):
+        """Input columns the graph reads."""
+        return [node.params[0] for node in self.order if node.op == "col"]
+
+    def evaluate(self, columns):
+        """Evaluate all outputs over arrays of input columns."""
+        values = {}
+        for node in self.order:
+            if node.op == "col":
+                values[node.key] = np.asarray(columns[node.params[0]], dtype=np.float32)
+            else:
+                args = [values[arg.key] for arg in node.args]
+                values[node.key] = _BATCH[node.op](node.params, *args)
+        return {name: values[node.key] for name, node in self.outputs.items()}
+
+    def streaming(self):
+        return StreamingEvaluator(self)
+
+
+class StreamingEvaluator:
+    """Incremental evaluation of an IndicatorGraph, one bar per update()."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.state = {}
+        for node in graph.order:
+            if node.op == "sma":
+                # Running (sum of non-NaN values, NaN count) and the last
+                # window + 1 of them, so each SMA is the same prefix-sum
+                # difference the batch path takes
+                self.state[node.key] = [deque([(0.0, 0)], maxlen=node.params[0] + 1), 0.0, 0]
+            elif node.op in ("shift", "pct_change"):
+                self.state[node.key] = deque(maxlen=node.params[0] + 1)
+
+    def update(self, bar):
+        """Feed one bar (a mapping of input columns) and return the outputs."""
+        values = {}
+        for node in self.graph.order:
+            args = [values[arg.key] for arg in node.args]
+            values[node.key] = self._step(node, bar, *args)
+        return {name: values[node.key] for name, node in self.graph.outputs.items()}
+
+    def warm_up(self, columns):
+        """Feed historical bars in order; returns the outputs for the last one."""
+        names = self.graph.columns()
+        out = None
+        for row in zip(*(np.asarray(columns[name], dtype=np.float64) for name in names)):
+            out = self.update(dict(zip(names, row)))
+        return out
+
+    def _step(self, node, bar, *args):
+        # Values are float32 like the batch arrays, and SMAs and ratios are
+        # computed the same way, so both paths cross on the same bars
+        op = node.op
+        if op == "col":
+            return np.float32(bar[node.params[0]])
+        if op == "const":
+            return np.float32(node.params[0])
+        if op == "sma":
+            history, total, nans = self.state[node.key]
+            value = args[0]
+            if math.isnan(value):
+                nans += 1
+            else:
+                total += float(value)
+            history.append((total, nans))
+            self.state[node.key][1:] = [total, nans]
+            if len(history) < history.maxlen or nans != history[0][1]:
+                return np.float32(math.nan)
+            return np.float32((total - history[0][0]) / (history.maxlen - 1))
+        if op == "shift":
+            history = self.state[node.key]
+            history.append(args[0])
+            return history[0] if len(history) == history.maxlen else np.float32(math.nan)
+        if op == "pct_change":
+            history = self.state[node.key]
+            history.append(args[0])
+            if len(history) < history.maxlen:
+                return np.float32(math.nan)
+            return args[0] / history[0] - np.float32(1)
+        if op == "gt":
+            return args[0] > args[1]
+        if op == "lt":
+            return args[0] < args[1]
+        if op == "ge":
+            return args[0] >= args[1]
+        if op == "le":
+            return args[0] <= args[1]
+        if op == "and":
+            return bool(args[0] and args[1])
+        if op == "or":
+            return bool(args[0] or args[1])
+        if op == "not":
+            return not args[0]
+        if op == "signal":
+            return -1 if args[1] else (1 if args[0] else 0)
+        raise ValueError(f"Unknown indicator op: {op}")
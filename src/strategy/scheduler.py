@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from src.data.market_calendar import MarketCalendar
+
+
+def now_utc():
+    return datetime.now(timezone.utc)
+
+
+class BarCloseScheduler:
+    """
+    Calls an async callback right after each bar closes.
+
+    Bar closes come from the cached market calendar: every bar_minutes from
+    the session open, with the session close (including early closes) as the
+    final bar. With bar_minutes=None there is one call per session, at the
+    close, to match daily bars. Closed periods are slept through in one go.
+    """
+
+    def __init__(self, calendar, callback, bar_minutes=None, delay=1.0):
+        self.calendar = calendar
+        self.callback = callback
+        self.bar_minutes = bar_minutes
+        self.delay = timedelta(seconds=delay)
+        self._stopped = asyncio.Event()
+
+    def next_bar_close(self, now):
+        """The first bar close strictly after now."""
+        open_, close = self.calendar.next_session(now)
+        if self.bar_minutes is None:
+            return close
+        bar = timedelta(minutes=self.bar_minutes)
+        if now < open_:
+            return min(open_ + bar, close)
+        bars_done = (now - open_) // bar
+        return min(open_ + (bars_done + 1) * bar, close)
+
+    async def sleep_until(self, target):
+        """Sleep until a wall-clock time, correcting for drift on long sleeps."""
+        while not self._stopped.is_set():
+            remaining = (target - now_utc()).total_seconds()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=min(remaining, 3600))
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._stopped.set()
+
+    async def run(self):
+        """Fire the callback after every bar close until stop() is called."""
+        while not self._stopped.is_set():
+            bar_close = self.next_bar_close(now_utc())
+            print(f"Next evaluation at {bar_close + self.delay}")
+            await self.sleep_until(bar_close + self.delay)
+            if self._stopped.is_set():
+                break
+            try:
+                await self.callback(bar_close)
+            except Exception as e:
+                print(f"Error: {e}")
+
+
+async def run_live(bot, bar_minutes=None, delay=1.0):
+    """Drive bot.run_strategy_async from bar closes on the bot's own API connection."""
+    if getattr(bot, "order_manager", None) is not None:
+        await bot.order_manager.start()
+    calendar = MarketCalendar(bot.api)
+    scheduler = BarCloseScheduler(calendar, bot.run_strategy_async, bar_minutes, delay)
+    await scheduler.run()
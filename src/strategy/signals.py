@@ -0,0 +1,43 @@
+from functools import lru_cache
+from src.strategy.indicators import (
+    IndicatorGraph,
+    col,
+    cross_above,
+    cross_below,
+    signal,
+    sma,
+)
+
+
+@lru_cache(maxsize=None)
+def sma_crossover(fast=20, slow=50, trend=100):
+    """
+    The SPY bot's rule: buy when the fast SMA crosses above the slow SMA while
+    the slow SMA is above the trend SMA; sell when the fast crosses below.
+    """
+    close = col("close")
+    fast_sma, slow_sma, trend_sma = sma(close, fast), sma(close, slow), sma(close, trend)
+    buy = cross_above(fast_sma, slow_sma) & (slow_sma > trend_sma)
+    sell = cross_below(fast_sma, slow_sma)
+    return IndicatorGraph(
+        {
+            f"sma_{fast}": fast_sma,
+            f"sma_{slow}": slow_sma,
+            f"sma_{trend}": trend_sma,
+            "signal": signal(buy, sell),
+        }
+    )
+
+
+@lru_cache(maxsize=None)
+def sma_regime(short_window=10, long_window=100):
+    """backtest_ma's rule: 1 while the short SMA is above the long SMA, -1 while below."""
+    close = col("close")
+    short_sma, long_sma = sma(close, short_window), sma(close, long_window)
+    return IndicatorGraph(
+        {
+            "short_sma": short_sma,
+            "long_sma": long_sma,
+            "signal": signal(short_sma > long_sma, short_sma < long_sma),
+        }
+    )
@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold-start budgets for the quick commands, in seconds. Measured around
+# 0.2-0.3 s; importing alpaca-py alone takes about 1 s.
+IMPORT_BUDGET = 0.5
+COMMAND_BUDGET = 1.0
+
+HEAVY_MODULES = ["pandas", "numpy", "alpaca", "alpaca_trade_api", "matplotlib"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.cli
+import src.account.positions
+elapsed = time.perf_counter() - start
+heavy = [name for name in json.loads(sys.argv[1]) if name in sys.modules]
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def test_positions_import_is_light():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["heavy"] == []
+    assert probe["elapsed"] < IMPORT_BUDGET
+
+
+def test_positions_help_starts_quickly():
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "main.py", "positions", "--help"],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+    )
+    assert time.perf_counter() - start < COMMAND_BUDGET
@@ -0,0 +1,38 @@
+import numpy as np
+from src.strategy.indicators import IndicatorGraph, col, pct_change, signal, sma
+from src.strategy.signals import sma_crossover, sma_regime
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+
+
+def assert_streaming_matches(graph, close):
+    batch = graph.evaluate({"close": close})
+    evaluator = graph.streaming()
+    streamed = {name: np.empty(len(close), dtype=values.dtype) for name, values in batch.items()}
+    for i, price in enumerate(close):
+        for name, value in evaluator.update({"close": price}).items():
+            streamed[name][i] = value
+    for name, values in batch.items():
+        np.testing.assert_array_equal(streamed[name], values, err_msg=name)
+
+
+def test_streaming_matches_batch_on_signal_rules():
+    close = random_walk(200_000)
+    assert_streaming_matches(sma_crossover(20, 50, 100), close)
+    assert_streaming_matches(sma_regime(10, 100), close)
+
+
+def test_streaming_matches_batch_on_composed_indicators():
+    close = random_walk(5_000, seed=1)
+    momentum = sma(pct_change(col("close")), 5)
+    graph = IndicatorGraph(
+        {
+            "smooth": sma(sma(col("close"), 5), 3),
+            "momentum": momentum,
+            "signal": signal(momentum > 0, momentum < 0),
+        }
+    )
+    assert_streaming_matches(graph, close)
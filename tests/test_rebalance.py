@@ -0,0 +1,27 @@
+from src.order.rebalance import PlannedOrder, plan_rebalance
+
+
+def test_covers_only_plan_is_not_scaled():
+    orders = plan_rebalance({"a": {"SPY": 0}}, {"SPY": -10}, {"SPY": 100.0}, buying_power=500)
+    assert orders == [PlannedOrder("SPY", "buy", 10.0, 100.0)]
+
+
+def test_long_to_short_splits_into_closing_and_opening_sells():
+    orders = plan_rebalance({"a": {"SPY": -5}}, {"SPY": 10}, {"SPY": 100.0}, buying_power=0)
+    assert orders == [
+        PlannedOrder("SPY", "sell", 10.0, 100.0),
+        PlannedOrder("SPY", "sell", 5.0, 100.0),
+    ]
+
+
+def test_short_to_long_scales_only_the_opening_buy():
+    orders = plan_rebalance({"a": {"SPY": 10}}, {"SPY": -10}, {"SPY": 100.0}, buying_power=1500)
+    assert orders == [
+        PlannedOrder("SPY", "buy", 10.0, 100.0),
+        PlannedOrder("SPY", "buy", 5.0, 100.0),
+    ]
+
+
+def test_untargeted_holdings_are_left_alone():
+    orders = plan_rebalance({"a": {"SPY": 10}}, {"SPY": 10, "QQQ": 7}, {"SPY": 100.0}, buying_power=0)
+    assert orders == []